@@ -0,0 +1,6 @@
+"""
+Offline tooling: replaying historical data through a Trader, analysing the results and
+bundling a round file into a single submittable trader.py.
+
+Nothing here is submitted, so it may use anything installed locally.
+"""
@@ -0,0 +1,135 @@
+"""
+Replay a day through a Trader and split its PnL by (strategy, product).
+
+    python -m backtester.attribution round4/tariffs.py [prices.csv [trades.csv [observations.csv]]] [--out pnl.npz]
+
+Positions are carried at average cost per (strategy, product): closing trades realise
+PnL against that cost, and the open position is marked to the top-of-book mid every tick.
+Storage paid on long inventory (macarons) is booked as realised PnL of the strategy that
+holds the product, from the engine's storage rows.
+The cumulative realised/unrealised arrays (ticks x keys) can be saved for plotting.
+Without data files a synthetic day of the round 1-2 products is used.
+"""
+import argparse
+from typing import Dict, List, Tuple
+import numpy as np
+from backtester.engine import BacktestResult, load_trader, run_backtest
+from backtester.replay import ReplayStore
+
+SYNTHETIC_MIDS = {
+    "RAINFOREST_RESIN": 10000, "KELP": 2030, "SQUID_INK": 1900, "CROISSANTS": 4280, "JAMS": 6600,
+    "DJEMBES": 13400, "PICNIC_BASKET1": 59000, "PICNIC_BASKET2": 30400,
+}
+
+
+class Attribution:
+    """
+    Cumulative realised and unrealised PnL per tick; column k belongs to keys[k] = (strategy, product).
+    """
+
+    def __init__(self, timestamps: np.ndarray, keys: List[Tuple[str, str]], realised: np.ndarray, unrealised: np.ndarray):
+        self.timestamps = timestamps
+        self.keys = keys
+        self.realised = realised
+        self.unrealised = unrealised
+
+    @property
+    def total(self) -> np.ndarray:
+        return self.realised + self.unrealised
+
+    def final(self) -> Dict[Tuple[str, str], Tuple[float, float]]:
+        """
+        (realised, unrealised) at the last tick per key.
+        """
+        return {key: (float(self.realised[-1, k]), float(self.unrealised[-1, k])) for k, key in enumerate(self.keys)}
+
+    def by_strategy(self) -> Dict[str, np.ndarray]:
+        """
+        Total PnL per tick summed over each strategy's products.
+        """
+        totals: Dict[str, np.ndarray] = {}
+        for k, (strategy, _) in enumerate(self.keys):
+            totals[strategy] = totals.get(strategy, 0) + self.total[:, k]
+        return totals
+
+    def save(self, path: str):
+        np.savez_compressed(path, timestamps=self.timestamps, keys=np.array(self.keys, dtype=str).reshape(-1, 2),
+                            realised=self.realised, unrealised=self.unrealised)
+
+
+def attribute(result: BacktestResult) -> Attribution:
+    """
+    Walk each key's fills once at average cost, then mark every tick in one vectorised step.
+    """
+    n = len(result.timestamps)
+    keys = sorted(set(zip(result.strategies, result.symbols))
+                  | set(zip(result.storage_strategies, result.storage_symbols)))
+    realised = np.zeros((n, len(keys)))
+    unrealised = np.zeros((n, len(keys)))
+    for k, (strategy, product) in enumerate(keys):
+        rows = np.flatnonzero((result.strategies == strategy) & (result.symbols == product))
+        # State after each fill.
+        positions = np.empty(len(rows))
+        costs = np.empty(len(rows))
+        cumulative = np.empty(len(rows))
+        position, cost, booked = 0, 0.0, 0.0
+        for j, row in enumerate(rows):
+            price, quantity = result.prices[row], int(result.quantities[row])
+            if position * quantity < 0:
+                closed = min(abs(quantity), abs(position)) * (1 if position > 0 else -1)
+                booked += closed * (price - cost)
+                position -= closed
+                quantity += closed
+            if quantity:
+                cost = (cost * position + price * quantity) / (position + quantity) if position + quantity else 0.0
+                position += quantity
+            if position == 0:
+                cost = 0.0
+            positions[j], costs[j], cumulative[j] = position, cost, booked
+
+        # Last fill at or before each tick; -1 before the first fill.
+        last = np.searchsorted(result.ticks[rows], np.arange(n), side="right") - 1
+        started = last >= 0
+        realised[started, k] = cumulative[last[started]]
+        charged = (result.storage_strategies == strategy) & (result.storage_symbols == product)
+        if charged.any():
+            paid = np.zeros(n)
+            np.add.at(paid, result.storage_ticks[charged], result.storage_costs[charged])
+            realised[:, k] -= np.cumsum(paid)
+        if product in result.products:
+            mid = result.mid(product)
+            held = positions[last[started]]
+            unrealised[started, k] = np.where(held != 0, held * (mid[started] - costs[last[started]]), 0.0)
+    return Attribution(result.timestamps, keys, realised, unrealised)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trader", help="round file defining Trader, e.g. round4/tariffs.py")
+    parser.add_argument("prices", nargs="?")
+    parser.add_argument("trades", nargs="?")
+    parser.add_argument("observations", nargs="?")
+    parser.add_argument("--ticks", type=int, default=2000, help="length of the synthetic day")
+    parser.add_argument("--out", help="save the per-tick arrays to this .npz file")
+    args = parser.parse_args()
+
+    if args.prices:
+        store = ReplayStore.from_csv(args.prices, args.trades, args.observations)
+    else:
+        store = ReplayStore.synthetic(SYNTHETIC_MIDS, ticks=args.ticks)
+    result = run_backtest(load_trader(args.trader), store)
+    attribution = attribute(result)
+
+    print(f"{'strategy':<16} {'product':<30} {'realised':>12} {'unrealised':>12} {'total':>12}")
+    for (strategy, product), (realised, unrealised) in sorted(attribution.final().items()):
+        print(f"{strategy:<16} {product:<30} {realised:>12.1f} {unrealised:>12.1f} {realised + unrealised:>12.1f}")
+    for strategy, total in sorted(attribution.by_strategy().items()):
+        print(f"{strategy}: {total[-1]:.1f}")
+    if result.reuse:
+        print(f"reused decisions (skipped/total): {result.reuse}")
+    if args.out:
+        attribution.save(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the voucher implied-vol solver over a whole day.
+
+    python -m backtester.bench_iv [prices_round_3_day_0.csv] [--days-to-expiry 7]
+
+Without a prices file a synthetic day is generated from Black-Scholes prices on a
+random-walk VOLCANIC_ROCK path with a smile and some quote noise.
+"""
+import argparse
+import time
+import numpy as np
+from backtester.replay import ReplayStore
+from trading.options import (VOUCHER_STRIKES, UNDERLYING, TICKS_PER_DAY, black_scholes, implied_vol,
+                             moneyness, fit_smile)
+
+
+def voucher_matrix(store: ReplayStore):
+    """
+    Rock mids and a (ticks, strikes) matrix of voucher mids from the store.
+    """
+    products = [p for p in VOUCHER_STRIKES if p in store.series]
+    strikes = np.array([VOUCHER_STRIKES[p] for p in products], dtype=float)
+    return store.series[UNDERLYING].mid, store.mids(products), strikes
+
+
+def synthetic_day(days_to_expiry: float, ticks: int = 10000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    spot = 10000 * np.exp(np.cumsum(rng.normal(0.0, 0.0002, ticks)))
+    strikes = np.array(list(VOUCHER_STRIKES.values()), dtype=float)
+    prices = np.empty((ticks, len(strikes)))
+    timestamps = np.arange(ticks) * 100
+    for i in range(ticks):
+        tte = days_to_expiry - timestamps[i] / TICKS_PER_DAY
+        m = moneyness(spot[i], strikes, tte)
+        vols = 0.012 + 0.02 * m * m + rng.normal(0.0, 0.0002, len(strikes))
+        prices[i] = np.round(black_scholes(spot[i], strikes, tte, vols)[0] * 2) / 2
+    return spot, prices, strikes, timestamps
+
+
+def solve_day(spot, prices, strikes, timestamps, days_to_expiry: float, warm: bool):
+    ivs = np.full(len(strikes), np.nan)
+    solved = fallbacks = 0
+    start = time.perf_counter()
+    for i in range(len(spot)):
+        if not spot[i] > 0:
+            continue
+        tte = max(days_to_expiry - timestamps[i] / TICKS_PER_DAY, 1e-6)
+        guess = ivs if warm else np.full(len(strikes), np.nan)
+        new, failed = implied_vol(prices[i], spot[i], strikes, tte, guess)
+        ivs = np.where(np.isfinite(new), new, ivs)
+        solved += int(np.isfinite(new).sum())
+        fallbacks += failed
+        fit_smile(moneyness(spot[i], strikes, tte), new)
+    return time.perf_counter() - start, solved, fallbacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="?", help="prices CSV containing VOLCANIC_ROCK and its vouchers")
+    parser.add_argument("--days-to-expiry", type=float, default=6.0)
+    args = parser.parse_args()
+
+    if args.prices:
+        store = ReplayStore.from_csv(args.prices)
+        spot, prices, strikes = voucher_matrix(store)
+        timestamps = store.timestamps
+    else:
+        spot, prices, strikes, timestamps = synthetic_day(args.days_to_expiry)
+
+    for warm in (True, False):
+        elapsed, solved, fallbacks = solve_day(spot, prices, strikes, timestamps, args.days_to_expiry, warm)
+        label = "warm start" if warm else "cold start"
+        print(f"{label}: {solved} IVs in {elapsed:.3f}s -> {solved / elapsed:,.0f} solves/s, "
+              f"{elapsed / len(spot) * 1e6:.1f} us/tick, {fallbacks} bisection fallbacks")
+
+
+if __name__ == "__main__":
+    main()
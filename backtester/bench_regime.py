@@ -0,0 +1,66 @@
+"""
+Replay sunlight observations through SunlightRegime and report detection latency.
+
+    python -m backtester.bench_regime [observations_round_4_day_1.csv] [--critical 45]
+
+For every downward crossing of the critical index it reports how many ticks of warning the
+FALLING flag gave beforehand. (LOW is a plain threshold, so it is flagged on the crossing tick.)
+Without a file a synthetic sunlight path is used.
+"""
+import argparse
+import time
+import numpy as np
+from backtester.replay import load_observations
+from trading.regime import SunlightRegime, FALLING, LOW
+
+
+def synthetic_sunlight(ticks: int = 10000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(ticks)
+    return 55 + 15 * np.sin(2 * np.pi * t / 4000) + np.cumsum(rng.normal(0.0, 0.02, ticks))
+
+
+def replay(sunlight: np.ndarray, detector: SunlightRegime):
+    regimes = np.empty(len(sunlight), dtype=np.int8)
+    start = time.perf_counter()
+    for i, value in enumerate(sunlight):
+        regimes[i] = detector.update(value)
+    return regimes, time.perf_counter() - start
+
+
+def crossing_report(sunlight: np.ndarray, regimes: np.ndarray, critical: float):
+    below = sunlight < critical
+    crossings = np.flatnonzero(below[1:] & ~below[:-1]) + 1
+    rows = []
+    for c in crossings:
+        # Length of the FALLING run that ended at the crossing.
+        lead = 0
+        while c - lead - 1 >= 0 and regimes[c - lead - 1] == FALLING:
+            lead += 1
+        rows.append((int(c), lead))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("observations", nargs="?", help="observations CSV with a sunlightIndex column")
+    parser.add_argument("--critical", type=float, default=45.0)
+    parser.add_argument("--window", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.observations:
+        sunlight = load_observations(args.observations)[1]["sunlightIndex"]
+        sunlight = sunlight[np.isfinite(sunlight)]
+    else:
+        sunlight = synthetic_sunlight()
+
+    detector = SunlightRegime(critical=args.critical, window=args.window)
+    regimes, elapsed = replay(sunlight, detector)
+    print(f"{len(sunlight)} ticks in {elapsed * 1e3:.1f} ms ({elapsed / len(sunlight) * 1e6:.2f} us/tick)")
+    print(f"ticks flagged: LOW {int((regimes == LOW).sum())}, FALLING {int((regimes == FALLING).sum())}")
+    for tick, lead in crossing_report(sunlight, regimes, args.critical):
+        print(f"crossing at tick {tick}: FALLING warning {lead} ticks ahead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Cold-import cost of datamodel and of every round's Trader module, in the style of
+`python -X importtime`.
+
+    python -m backtester.bench_startup [round4/tariffs.py ...] [--runs 5] [--top 3]
+
+Each target is imported in a fresh interpreter `--runs` times. The report gives the median
+wall time of the import and, from -X importtime, the heaviest top-level modules it pulled
+in (cumulative microseconds). Without arguments datamodel, the root-level round*.py files
+and every round*/ file are measured.
+"""
+import argparse
+import glob
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Imported before the timer starts, and left out of the breakdown.
+PREAMBLE = "import importlib.util, time\n"
+
+
+def _import_code(target: str) -> str:
+    if target.endswith(".py"):
+        load = (
+            f"spec = importlib.util.spec_from_file_location('submission', {os.path.join(ROOT, target)!r})\n"
+            "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+        )
+    else:
+        load = f"import {target}\n"
+    return PREAMBLE + "start = time.perf_counter()\n" + load + "print(time.perf_counter() - start)\n"
+
+
+def parse_importtime(stderr: str, target: str = None) -> Dict[str, int]:
+    """
+    Cumulative microseconds of each module imported at the top level, or of each module
+    imported directly by `target` when it is itself a module.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown by two extra spaces per level after the separator space.
+        entries.append(((len(name) - len(name.lstrip(" ")) - 1) // 2, name.strip(), int(cumulative)))
+    depth = 0
+    if target in (name for _, name, _ in entries):
+        depth = 1
+        end = next(k for k, (d, name, _) in enumerate(entries) if d == 0 and name == target)
+        # importtime prints children before their parent.
+        start = end
+        while start > 0 and entries[start - 1][0] > 0:
+            start -= 1
+        entries = entries[start:end]
+    return {name: cumulative for d, name, cumulative in entries if d == depth}
+
+
+def measure(target: str, runs: int = 5) -> Tuple[float, Dict[str, int]]:
+    """
+    (median import seconds, median cumulative microseconds per top-level dependency).
+    Modules the interpreter and the timing preamble import anyway are left out.
+    """
+    startup = subprocess.run([sys.executable, "-X", "importtime", "-c", PREAMBLE],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+    baseline = set(parse_importtime(startup.stderr))
+    times: List[float] = []
+    samples: Dict[str, List[int]] = {}
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-X", "importtime", "-c", _import_code(target)],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+        times.append(float(output.stdout.split()[-1]))
+        for module, cumulative in parse_importtime(output.stderr, target).items():
+            if module not in baseline:
+                samples.setdefault(module, []).append(cumulative)
+    return statistics.median(times), {m: int(statistics.median(v)) for m, v in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", help="module names or round files")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3, help="heaviest dependencies to list")
+    args = parser.parse_args()
+
+    targets = args.targets or ["datamodel"] + sorted(
+        os.path.relpath(path, ROOT)
+        for pattern in ("round*.py", os.path.join("round*", "*.py"))
+        for path in glob.glob(os.path.join(ROOT, pattern))
+    )
+    for target in targets:
+        try:
+            seconds, modules = measure(target, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{target:<32} failed: {e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e}")
+            continue
+        heaviest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        detail = ", ".join(f"{name} {us / 1e3:.1f}" for name, us in heaviest)
+        print(f"{target:<32} {seconds * 1e3:7.1f} ms   {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Bundle a round file and the trading package modules it uses into one submittable trader.py.
+
+    python -m backtester.bundle round4/tariffs.py -o trader.py [--keep-prints]
+
+The platform only accepts a single file, so the bundler:
+    1. follows `from trading.<module> import ...` recursively and inlines those modules
+       in dependency order, ahead of the round file itself;
+    2. merges the remaining imports (stdlib, numpy, datamodel) into one block;
+    3. drops every top-level function, class, constant, import and method that cannot be
+       reached from Trader (methods are kept when their name is used anywhere that is kept,
+       including as a string, so getattr lookups and bound-method dispatch survive);
+    4. strips bare print() calls unless --keep-prints is given.
+datamodel is imported, not inlined: the platform ships its own copy and builds the
+TradingState objects from it.
+
+It then times importing the bundle and constructing Trader in fresh interpreters, next to
+the same numbers for the original round file.
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+PACKAGE = "trading"
+
+
+def _module_path(root: str, module: str) -> str:
+    return os.path.join(root, *module.split(".")) + ".py"
+
+
+def _is_local(node: ast.stmt) -> bool:
+    return isinstance(node, ast.ImportFrom) and (node.module or "").split(".")[0] == PACKAGE
+
+
+def load_modules(entry: str, root: str) -> List[Tuple[str, ast.Module]]:
+    """
+    (name, tree) for every package module the entry file needs, dependencies first, entry last.
+    """
+    ordered: List[Tuple[str, ast.Module]] = []
+    seen: Set[str] = set()
+
+    def visit(name: str, path: str):
+        if name in seen:
+            return
+        seen.add(name)
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        for node in tree.body:
+            if isinstance(node, ast.Import) and any(a.name.split(".")[0] == PACKAGE for a in node.names):
+                raise ValueError(f"{path}: use 'from {PACKAGE}.<module> import ...' so it can be inlined")
+            if _is_local(node):
+                if any(alias.asname for alias in node.names):
+                    raise ValueError(f"{path}: aliased imports from {node.module} cannot be inlined")
+                visit(node.module, _module_path(root, node.module))
+        ordered.append((name, tree))
+
+    visit("__entry__", entry)
+    return ordered
+
+
+def _defined_names(node: ast.stmt) -> List[str]:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, ast.Assign):
+        return [n.id for target in node.targets for n in ast.walk(target) if isinstance(n, ast.Name)]
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return [node.target.id]
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return [(alias.asname or alias.name).split(".")[0] for alias in node.names]
+    return []
+
+
+def _referenced(node: ast.AST) -> Set[str]:
+    """
+    Every identifier a node could use: names, attributes and identifier-like strings.
+    """
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute):
+            names.add(child.attr)
+        elif isinstance(child, ast.Constant) and isinstance(child.value, str) and child.value.isidentifier():
+            names.add(child.value)
+    return names
+
+
+def _is_method(node: ast.stmt) -> bool:
+    return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+
+
+def _live_parts(node: ast.stmt, used: Set[str]) -> List[ast.AST]:
+    """
+    The parts of a top-level statement that are kept given the names used so far.
+    """
+    if not isinstance(node, ast.ClassDef):
+        return [node]
+    parts = node.decorator_list + node.bases + node.keywords
+    for stmt in node.body:
+        if not _is_method(stmt) or stmt.name in used or stmt.name.startswith("__"):
+            parts.append(stmt)
+    return parts
+
+
+class _StripPrints(ast.NodeTransformer):
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for field in ("body", "orelse", "finalbody"):
+            body = getattr(node, field, None)
+            if isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                kept = [s for s in body if not (
+                    isinstance(s, ast.Expr) and isinstance(s.value, ast.Call)
+                    and isinstance(s.value.func, ast.Name) and s.value.func.id == "print"
+                )]
+                if not kept and field == "body":
+                    kept = [ast.Pass()]
+                setattr(node, field, kept)
+        return node
+
+
+def bundle(entry: str, root: str = ".", keep_prints: bool = False, roots: Tuple[str, ...] = ("Trader",)) -> str:
+    """
+    Source of the single-file submission for `entry`.
+    """
+    modules = load_modules(entry, root)
+    statements: List[Tuple[str, ast.stmt]] = []
+    owners: Dict[str, str] = {}
+    for name, tree in modules:
+        body = tree.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+            body = body[1:]  # module docstring
+        for node in body:
+            if _is_local(node):
+                continue
+            if isinstance(node, ast.If) and "__name__" in _referenced(node.test):
+                continue
+            if not isinstance(node, (ast.Import, ast.ImportFrom)):
+                for defined in _defined_names(node):
+                    if defined in owners and owners[defined] != name:
+                        raise ValueError(f"{defined} is defined in both {owners[defined]} and {name}")
+                    owners[defined] = name
+            statements.append((name, node))
+
+    # Grow the set of used names from the roots (and any bare module-level code) to a fixpoint.
+    used = set(roots) | {"run"}
+    for _, node in statements:
+        if not _defined_names(node):
+            used |= _referenced(node)
+    while True:
+        grown = set(used)
+        for _, node in statements:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                continue
+            names = _defined_names(node)
+            if names and any(n in used for n in names):
+                for part in _live_parts(node, used):
+                    grown |= _referenced(part)
+        if grown == used:
+            break
+        used = grown
+
+    imports: Dict[str, Set[str]] = {}
+    plain_imports: List[str] = []
+    body: List[ast.stmt] = []
+    for _, node in statements:
+        if isinstance(node, ast.ImportFrom):
+            kept = {alias.name if not alias.asname else f"{alias.name} as {alias.asname}"
+                    for alias in node.names if (alias.asname or alias.name) in used}
+            if kept:
+                imports.setdefault(node.module, set()).update(kept)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if (alias.asname or alias.name).split(".")[0] in used:
+                    line = f"import {alias.name}" + (f" as {alias.asname}" if alias.asname else "")
+                    if line not in plain_imports:
+                        plain_imports.append(line)
+        else:
+            names = _defined_names(node)
+            if names and not any(n in used for n in names):
+                continue
+            if isinstance(node, ast.ClassDef):
+                node.body = [s for s in node.body if not _is_method(s) or s.name in used or s.name.startswith("__")]
+            body.append(node)
+
+    tree = ast.Module(body=body, type_ignores=[])
+    if not keep_prints:
+        tree = _StripPrints().visit(tree)
+    ast.fix_missing_locations(tree)
+    header = [f"# Generated by backtester.bundle from {os.path.relpath(entry, root)}; edit the sources instead."]
+    header += sorted(plain_imports)
+    header += [f"from {module} import {', '.join(sorted(names))}" for module, names in sorted(imports.items())]
+    return "\n".join(header) + "\n\n\n" + ast.unparse(tree) + "\n"
+
+
+def startup_time(path: str, root: str, runs: int = 5) -> Tuple[float, float]:
+    """
+    Median (import, Trader()) seconds for a round file, each run in a fresh interpreter.
+    """
+    code = (
+        "import importlib.util, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"spec = importlib.util.spec_from_file_location('submission', {path!r})\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "loaded = time.perf_counter()\n"
+        "module.Trader()\n"
+        "print(loaded - start, time.perf_counter() - loaded)\n"
+    )
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        samples.append(tuple(float(v) for v in output.stdout.split()[-2:]))
+    return statistics.median(s[0] for s in samples), statistics.median(s[1] for s in samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entry", help="round file defining Trader, e.g. round4/tariffs.py")
+    parser.add_argument("-o", "--output", default="trader.py")
+    parser.add_argument("--root", default=".", help="directory containing the trading package and datamodel.py")
+    parser.add_argument("--keep-prints", action="store_true")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per startup timing")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    source = bundle(args.entry, root, args.keep_prints)
+    with open(args.output, "w") as f:
+        f.write(source)
+    compile(source, args.output, "exec")
+
+    original = sum(os.path.getsize(_module_path(root, name)) if name != "__entry__" else os.path.getsize(args.entry)
+                   for name, _ in load_modules(args.entry, root))
+    print(f"{args.output}: {len(source)} bytes from {original} bytes of sources")
+    for label, path in (("original", os.path.abspath(args.entry)), ("bundle", os.path.abspath(args.output))):
+        imported, constructed = startup_time(path, root, args.runs)
+        print(f"{label:<9} import {imported * 1e3:7.1f} ms   Trader() {constructed * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
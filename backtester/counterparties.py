@@ -0,0 +1,83 @@
+"""
+Scan a day's trades file and rank counterparties by how informed their flow is.
+
+    python -m backtester.counterparties prices.csv trades.csv [--horizon 10] [--product KELP]
+
+For every (trader, product) it reports trade count, net and gross volume and the markout
+per unit: signed quantity times the mid move from the tick the trade arrived to `horizon`
+ticks later, divided by the volume whose markout lands inside the day. Definitions match
+trading.counterparty.CounterpartyIndex, so the scan shows what the live index would report
+at the end of the day.
+"""
+import argparse
+from typing import List, Tuple
+import numpy as np
+from backtester.replay import ReplayStore, forward_fill
+from trading.counterparty import IGNORED_TRADERS
+
+
+def scan(store: ReplayStore, horizon: int = 10) -> List[Tuple[str, str, int, int, int, float]]:
+    """
+    (trader, product, trades, net volume, gross volume, markout per unit) rows,
+    most informed first.
+    """
+    trades = store.trades
+    n = len(store)
+    # Trades printed in [t[i-1], t[i]) arrive at tick i.
+    arrival = np.searchsorted(store.timestamps, trades.timestamps, side="right")
+    known = np.isin(trades.symbols, store.products) & (arrival < n)
+
+    moves = np.full(len(trades), np.nan)
+    for product in store.products:
+        rows = np.flatnonzero(known & (trades.symbols == product))
+        s = store.series[product]
+        mid = forward_fill((s.bid_prices[:, 0] + s.ask_prices[:, 0]) / 2.0)
+        ends = arrival[rows] + horizon
+        resolved = ends < n
+        moves[rows[resolved]] = mid[ends[resolved]] - mid[arrival[rows[resolved]]]
+
+    # One row per side of every trade: buyers gain +quantity, sellers -quantity.
+    traders = np.concatenate([trades.buyers[known], trades.sellers[known]])
+    products = np.concatenate([trades.symbols[known], trades.symbols[known]])
+    quantities = np.concatenate([trades.quantities[known], -trades.quantities[known]])
+    side_moves = np.concatenate([moves[known], moves[known]])
+    keep = ~np.isin(traders, [t for t in IGNORED_TRADERS if t is not None])
+    traders, products, quantities, side_moves = traders[keep], products[keep], quantities[keep], side_moves[keep]
+
+    trader_names, trader_codes = np.unique(traders.astype(str), return_inverse=True)
+    product_names, product_codes = np.unique(products.astype(str), return_inverse=True)
+    keys, inverse = np.unique(trader_codes * len(product_names) + product_codes, return_inverse=True)
+    resolved = np.isfinite(side_moves)
+    count = np.bincount(inverse, minlength=len(keys))
+    net = np.bincount(inverse, weights=quantities, minlength=len(keys))
+    gross = np.bincount(inverse, weights=np.abs(quantities), minlength=len(keys))
+    resolved_volume = np.bincount(inverse, weights=np.where(resolved, np.abs(quantities), 0), minlength=len(keys))
+    markout = np.bincount(inverse, weights=np.where(resolved, quantities * side_moves, 0.0), minlength=len(keys))
+    per_unit = np.divide(markout, resolved_volume, out=np.zeros(len(keys)), where=resolved_volume > 0)
+
+    rows = []
+    for j, key in enumerate(keys):
+        trader, product = trader_names[key // len(product_names)], product_names[key % len(product_names)]
+        rows.append((str(trader), str(product), int(count[j]), int(net[j]), int(gross[j]), float(per_unit[j])))
+    rows.sort(key=lambda row: row[5], reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", help="prices CSV for one day")
+    parser.add_argument("trades", help="trades CSV for the same day")
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument("--product", help="only report this product")
+    args = parser.parse_args()
+
+    store = ReplayStore.from_csv(args.prices, args.trades)
+    print(f"{'trader':<16} {'product':<30} {'trades':>7} {'net':>8} {'gross':>8} {'markout/unit':>13}")
+    for trader, product, count, net, gross, per_unit in scan(store, args.horizon):
+        if args.product and product != args.product:
+            continue
+        print(f"{trader:<16} {product:<30} {count:>7} {net:>8} {gross:>8} {per_unit:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
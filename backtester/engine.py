@@ -0,0 +1,236 @@
+import contextlib
+import importlib.util
+import io
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from datamodel import ConversionObservation, Order, OrderDepth, Trade
+from backtester.replay import ReplayStore, forward_fill
+from trading.conversions import STORAGE_COSTS, export_proceeds, import_cost
+from trading.risk import POSITION_LIMITS
+
+# Our name in Trade.buyer / Trade.seller, as on the exchange.
+SUBMISSION = "SUBMISSION"
+# Strategy recorded for fills a Trader did not tag through its RiskLayer.
+UNTAGGED = "untagged"
+
+
+def load_trader(path: str):
+    """
+    Instantiate the Trader class defined in a round file, e.g. round4/tariffs.py.
+    """
+    spec = importlib.util.spec_from_file_location("submission", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Trader()
+
+
+def match_orders(orders: List[Order], order_depth: OrderDepth, trades: List[Trade], position: int,
+                 limit: Optional[int]) -> List[Tuple[int, int, int]]:
+    """
+    Fill one product's orders the way the exchange does and return (fill price, signed quantity,
+    order price) fills; the order price is what RiskLayer tags are keyed by.
+
+    All orders are rejected if their total buy (or sell) quantity could take the position
+    past the limit. Otherwise each order first crosses the visible book, best level first,
+    at the book's price; what is left rests at the order's price and trades against
+    market trades printed before the next tick that went through it.
+    """
+    if limit is not None:
+        buys = sum(o.quantity for o in orders if o.quantity > 0)
+        sells = -sum(o.quantity for o in orders if o.quantity < 0)
+        if position + buys > limit or position - sells < -limit:
+            return []
+
+    asks = {p: -v for p, v in order_depth.sell_orders.items()}
+    bids = dict(order_depth.buy_orders)
+    remaining_trades = [[t.price, t.quantity] for t in trades]
+    fills = []
+    for order in orders:
+        quantity = abs(order.quantity)
+        buy = order.quantity > 0
+        book = asks if buy else bids
+        for price in sorted(book, reverse=not buy):
+            if quantity == 0 or (price > order.price if buy else price < order.price):
+                break
+            filled = min(quantity, book[price])
+            if filled > 0:
+                fills.append((price, filled if buy else -filled, order.price))
+                book[price] -= filled
+                quantity -= filled
+        for trade in remaining_trades:
+            if quantity == 0:
+                break
+            if trade[1] > 0 and (trade[0] <= order.price if buy else trade[0] >= order.price):
+                filled = min(quantity, trade[1])
+                fills.append((order.price, filled if buy else -filled, order.price))
+                trade[1] -= filled
+                quantity -= filled
+    return fills
+
+
+def allocate(tags: Optional[Dict[str, int]], quantity: int) -> List[Tuple[str, int]]:
+    """
+    Split a fill across the strategies whose intents at that price point the same way,
+    pro rata to their intent; the rounding remainder goes to the largest.
+    """
+    same_side = {s: q for s, q in (tags or {}).items() if q * quantity > 0}
+    if not same_side:
+        return [(UNTAGGED, quantity)]
+    total = sum(same_side.values())
+    shares = [(s, int(quantity * q / total)) for s, q in same_side.items()]
+    largest = max(range(len(shares)), key=lambda k: abs(same_side[shares[k][0]]))
+    shares[largest] = (shares[largest][0], shares[largest][1] + quantity - sum(q for _, q in shares))
+    return [(s, q) for s, q in shares if q != 0]
+
+
+def settle_conversion(conversions: int, observations: Dict[str, ConversionObservation],
+                      position: Dict[str, int]) -> Optional[Tuple[str, float, int]]:
+    """
+    (product, price, signed quantity) of a conversion request, or None if nothing converts.
+    Conversions apply to the first product with a conversion observation, only ever reduce
+    its position, and fill at the import cost (buying) or export proceeds (selling).
+    """
+    if not conversions:
+        return None
+    for product, observation in observations.items():
+        current = position.get(product, 0)
+        quantity = max(0, min(conversions, -current)) if conversions > 0 else min(0, max(conversions, -current))
+        if not quantity:
+            return None
+        price = import_cost(observation) if quantity > 0 else export_proceeds(observation)
+        return product, price, quantity
+    return None
+
+
+def storage_charges(position: Dict[str, int]) -> List[Tuple[str, float]]:
+    """
+    (product, cost) of this tick's storage on the long positions of products that charge it.
+    """
+    return [(product, position[product] * cost) for product, cost in STORAGE_COSTS.items()
+            if position.get(product, 0) > 0]
+
+
+class BacktestResult:
+    """
+    Fills of a replayed day in columnar form (conversions included, flagged in `converted`),
+    with the carried-forward top-of-book mid of every product for marking. Storage charged
+    on long inventory is kept apart as (tick, product, strategy, cost) rows.
+    """
+
+    def __init__(self, store: ReplayStore, fills: List[tuple], positions: Dict[str, int], elapsed: np.ndarray,
+                 storage: List[tuple] = ()):
+        self.timestamps = store.timestamps
+        self.products = store.products
+        self.mids = np.column_stack([
+            forward_fill((store.series[p].bid_prices[:, 0] + store.series[p].ask_prices[:, 0]) / 2.0)
+            for p in self.products
+        ]) if self.products else np.zeros((len(store), 0))
+        columns = list(zip(*fills)) if fills else [(), (), (), (), (), ()]
+        self.ticks = np.array(columns[0], dtype=np.int64)
+        self.symbols = np.array(columns[1], dtype=object)
+        self.prices = np.array(columns[2], dtype=float)
+        self.quantities = np.array(columns[3], dtype=np.int64)
+        self.strategies = np.array(columns[4], dtype=object)
+        self.converted = np.array(columns[5], dtype=bool)
+        columns = list(zip(*storage)) if storage else [(), (), (), ()]
+        self.storage_ticks = np.array(columns[0], dtype=np.int64)
+        self.storage_symbols = np.array(columns[1], dtype=object)
+        self.storage_strategies = np.array(columns[2], dtype=object)
+        self.storage_costs = np.array(columns[3], dtype=float)
+        self.positions = positions
+        # Wall time of each Trader.run call.
+        self.elapsed = elapsed
+        # Per-product "skipped/total" decision reuse, when the Trader has a ChangeDetector.
+        self.reuse = ""
+
+    def mid(self, product: str) -> np.ndarray:
+        return self.mids[:, self.products.index(product)]
+
+    def pnl(self) -> Dict[str, float]:
+        """
+        Final cash (net of storage) plus position marked at the last mid, per product.
+        """
+        result = {}
+        for product in set(self.symbols):
+            rows = self.symbols == product
+            cash = -(self.prices[rows] * self.quantities[rows]).sum()
+            cash -= self.storage_costs[self.storage_symbols == product].sum()
+            position = self.quantities[rows].sum()
+            last = self.mid(product)[-1] if product in self.products else 0.0
+            result[product] = float(cash + (position * last if position else 0.0))
+        return result
+
+
+def run_backtest(trader, store: ReplayStore, limits: Dict[str, int] = None, match_trades: bool = True,
+                 quiet: bool = True, on_tick: Callable = None) -> BacktestResult:
+    """
+    Replay a day through trader.run, matching its orders against each tick's book (and,
+    with `match_trades`, against the market trades that followed) and feeding positions,
+    own trades and traderData back in.
+
+    Fills are tagged with the strategy that asked for them when the Trader routes orders
+    through a RiskLayer (`trader.risk.tags`); conversions are tagged with the strategy the
+    Trader's registry assigns to the converted product. Conversions only ever reduce the
+    position and fill at the observation's import cost / export proceeds. Long inventory of
+    products in STORAGE_COSTS is charged storage on the position left at the end of each tick,
+    against the same strategy as conversions.
+
+    `on_tick(i, state, orders, conversions, trader_data)` is called after every Trader.run.
+    """
+    limits = POSITION_LIMITS if limits is None else limits
+    risk = getattr(trader, "risk", None)
+    registry = getattr(trader, "registry", None)
+    position: Dict[str, int] = {}
+    own_trades: Dict[str, List[Trade]] = {}
+    trader_data = ""
+    fills = []
+    storage = []
+    elapsed = np.zeros(len(store))
+    n = len(store)
+    for i in range(n):
+        timestamp = int(store.timestamps[i])
+        state = store.state(i, trader_data, position, own_trades)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            orders, conversions, trader_data = trader.run(state)
+        elapsed[i] = time.perf_counter() - start
+        if on_tick is not None:
+            on_tick(i, state, orders, conversions, trader_data)
+        tags = risk.tags if risk is not None else {}
+
+        next_trades = {}
+        if match_trades:
+            end = int(store.timestamps[i + 1]) if i + 1 < n else timestamp + 1
+            next_trades = store.trades.between(timestamp, end)
+
+        own_trades = {}
+        for symbol, symbol_orders in orders.items():
+            order_depth = state.order_depths.get(symbol)
+            if order_depth is None or not symbol_orders:
+                continue
+            current = position.get(symbol, 0)
+            for price, quantity, order_price in match_orders(symbol_orders, order_depth, next_trades.get(symbol, []),
+                                                current, limits.get(symbol)):
+                current += quantity
+                buyer, seller = (SUBMISSION, "") if quantity > 0 else ("", SUBMISSION)
+                own_trades.setdefault(symbol, []).append(Trade(symbol, price, abs(quantity), buyer, seller, timestamp))
+                for strategy, share in allocate(tags.get((symbol, order_price)), quantity):
+                    fills.append((i, symbol, price, share, strategy, False))
+            position[symbol] = current
+
+        conversion = settle_conversion(conversions, state.observations.conversionObservations, position)
+        if conversion is not None:
+            product, price, quantity = conversion
+            strategy = registry.resolve(product)[1].strategy if registry is not None else UNTAGGED
+            fills.append((i, product, price, quantity, strategy, True))
+            position[product] = position.get(product, 0) + quantity
+        for product, cost in storage_charges(position):
+            strategy = registry.resolve(product)[1].strategy if registry is not None else UNTAGGED
+            storage.append((i, product, strategy, cost))
+    result = BacktestResult(store, fills, position, elapsed, storage)
+    # A bundled Trader may have had the unused summary method stripped.
+    summary = getattr(getattr(trader, "changes", None), "summary", None)
+    if summary is not None:
+        result.reuse = summary()
+    return result
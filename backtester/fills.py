@@ -0,0 +1,103 @@
+"""
+Fill-quality report for a Trader replayed over a day: how much edge each fill gave up.
+
+    python -m backtester.fills round4/tariffs.py [prices.csv [trades.csv [observations.csv]]] [--k 1 5 10 50]
+
+Every own trade is joined with the mid of the tick it executed on and the mid k ticks later.
+With side = +1 for buys and -1 for sells, per unit:
+    effective spread = 2 * side * (price - mid before)       cost of crossing; negative when passive inside the spread
+    realised spread  = 2 * side * (price - mid k ticks later)
+    markout(k)       = side * (mid k ticks later - price)      what the fill earned after k ticks
+Figures are volume-weighted per (product, strategy); conversions are left out.
+"""
+import argparse
+from typing import Dict, Sequence, Tuple
+import numpy as np
+from backtester.attribution import SYNTHETIC_MIDS
+from backtester.engine import BacktestResult, load_trader, run_backtest
+from backtester.replay import ReplayStore
+
+
+class FillQuality:
+    """
+    Per-group fill statistics; row g belongs to groups[g] = (product, strategy) and markout
+    column j to ks[j]. Spreads use the first horizon.
+    """
+
+    def __init__(self, groups, ks, volume, effective_spread, realised_spread, markouts):
+        self.groups = groups
+        self.ks = ks
+        self.volume = volume
+        self.effective_spread = effective_spread
+        self.realised_spread = realised_spread
+        self.markouts = markouts
+
+    def rows(self) -> Dict[Tuple[str, str], Tuple[int, float, float, np.ndarray]]:
+        return {
+            group: (int(self.volume[g]), float(self.effective_spread[g]), float(self.realised_spread[g]), self.markouts[g])
+            for g, group in enumerate(self.groups)
+        }
+
+
+def analyse(result: BacktestResult, ks: Sequence[int] = (1, 5, 10, 50)) -> FillQuality:
+    """
+    All fills and horizons in one vectorised pass; fills whose horizon runs past the end of
+    the day are marked at the last tick.
+    """
+    ks = np.asarray(ks, dtype=np.int64)
+    rows = np.flatnonzero(~result.converted & np.isin(result.symbols, result.products))
+    ticks = result.ticks[rows]
+    prices = result.prices[rows]
+    quantities = result.quantities[rows]
+    sides = np.sign(quantities)
+    volumes = np.abs(quantities).astype(float)
+
+    column = {p: c for c, p in enumerate(result.products)}
+    columns = np.array([column[s] for s in result.symbols[rows]], dtype=np.int64)
+    last = len(result.timestamps) - 1
+    before = result.mids[ticks, columns]
+    # (fills, ks) matrix of later mids.
+    after = result.mids[np.minimum(ticks[:, None] + ks[None, :], last), columns[:, None]]
+
+    effective = 2 * sides * (prices - before)
+    realised = 2 * sides * (prices - after[:, 0])
+    markouts = sides[:, None] * (after - prices[:, None])
+
+    labels = np.array([f"{p}\0{s}" for p, s in zip(result.symbols[rows], result.strategies[rows])], dtype=object)
+    names, inverse = np.unique(labels, return_inverse=True) if len(labels) else (np.array([]), np.array([], dtype=np.int64))
+    groups = [tuple(name.split("\0")) for name in names]
+    volume = np.bincount(inverse, weights=volumes, minlength=len(groups))
+    safe = np.maximum(volume, 1)
+
+    def weighted(values: np.ndarray) -> np.ndarray:
+        return np.bincount(inverse, weights=np.nan_to_num(values) * volumes, minlength=len(groups)) / safe
+
+    markout_means = np.column_stack([weighted(markouts[:, j]) for j in range(len(ks))]) if len(ks) else np.zeros((len(groups), 0))
+    return FillQuality(groups, list(ks), volume, weighted(effective), weighted(realised), markout_means)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trader", help="round file defining Trader, e.g. round4/tariffs.py")
+    parser.add_argument("prices", nargs="?")
+    parser.add_argument("trades", nargs="?")
+    parser.add_argument("observations", nargs="?")
+    parser.add_argument("--k", nargs="+", type=int, default=[1, 5, 10, 50])
+    parser.add_argument("--ticks", type=int, default=2000, help="length of the synthetic day")
+    args = parser.parse_args()
+
+    if args.prices:
+        store = ReplayStore.from_csv(args.prices, args.trades, args.observations)
+    else:
+        store = ReplayStore.synthetic(SYNTHETIC_MIDS, ticks=args.ticks)
+    quality = analyse(run_backtest(load_trader(args.trader), store), args.k)
+
+    header = "".join(f" {'mo@' + str(k):>9}" for k in quality.ks)
+    print(f"{'product':<30} {'strategy':<16} {'volume':>8} {'eff sprd':>9} {'real sprd':>9}{header}")
+    for (product, strategy), (volume, effective, realised, markouts) in sorted(quality.rows().items()):
+        curve = "".join(f" {m:>9.2f}" for m in markouts)
+        print(f"{product:<30} {strategy:<16} {volume:>8} {effective:>9.2f} {realised:>9.2f}{curve}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Golden-output regression harness for Trader.run.
+
+    python -m backtester.golden record round4/tariffs.py golden.jsonl.gz [prices.csv [trades.csv [observations.csv]]]
+    python -m backtester.golden check candidate.py golden.jsonl.gz
+
+`record` replays a day through the reference Trader and writes, per tick, the inputs it
+was given (position, own trades) and exactly what it returned (orders in emitted order,
+conversions, traderData) plus its run time. `check` feeds a candidate Trader the very same
+states tick by tick and stops at the first tick whose output differs, printing both
+sides; otherwise it reports the mean time per tick saved against the reference.
+
+The data files (or the synthetic day's length) are stored in the golden file's header,
+so `check` needs no arguments beyond the candidate and the golden file.
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from datamodel import Trade
+from backtester.attribution import SYNTHETIC_MIDS
+from backtester.engine import load_trader, run_backtest
+from backtester.replay import ReplayStore
+
+
+def _plain(value):
+    """
+    json default for numpy scalars a Trader may put in its orders.
+    """
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _orders(orders) -> List[list]:
+    return [[o.symbol, o.price, o.quantity] for symbol_orders in orders.values() for o in symbol_orders]
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+
+def load_store(header: dict) -> ReplayStore:
+    if header.get("prices"):
+        return ReplayStore.from_csv(header["prices"], header.get("trades"), header.get("observations"))
+    return ReplayStore.synthetic(SYNTHETIC_MIDS, ticks=header["ticks"])
+
+
+def record(trader, store: ReplayStore, path: str, header: dict):
+    """
+    Write the reference Trader's per-tick inputs and outputs, one JSON line per tick.
+    """
+    rows = []
+
+    def on_tick(i, state, orders, conversions, trader_data):
+        rows.append({
+            "position": state.position,
+            "own_trades": [[t.symbol, t.price, t.quantity, t.buyer, t.seller, t.timestamp]
+                           for trades in state.own_trades.values() for t in trades],
+            "orders": _orders(orders),
+            "conversions": conversions,
+            "trader_data": trader_data,
+        })
+
+    result = run_backtest(trader, store, on_tick=on_tick)
+    with _open(path, "w") as f:
+        f.write(json.dumps(dict(header, ticks=len(store))) + "\n")
+        for row, elapsed in zip(rows, result.elapsed):
+            row["elapsed"] = float(elapsed)
+            f.write(json.dumps(row, default=_plain) + "\n")
+
+
+def read(path: str) -> Tuple[dict, Iterator[dict]]:
+    f = _open(path, "r")
+    header = json.loads(f.readline())
+
+    def rows():
+        with f:
+            for line in f:
+                yield json.loads(line)
+    return header, rows()
+
+
+def check(trader, store: ReplayStore, rows: Iterator[dict]) -> Tuple[Optional[dict], np.ndarray, np.ndarray]:
+    """
+    (first divergence or None, reference seconds per tick, candidate seconds per tick).
+    A divergence is {"tick", "timestamp", "field", "reference", "candidate"}.
+    """
+    reference_times, candidate_times = [], []
+    trader_data = ""
+    for i, row in enumerate(rows):
+        own_trades: Dict[str, List[Trade]] = {}
+        for symbol, price, quantity, buyer, seller, timestamp in row["own_trades"]:
+            own_trades.setdefault(symbol, []).append(Trade(symbol, price, quantity, buyer, seller, timestamp))
+        state = store.state(i, trader_data, row["position"], own_trades)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            orders, conversions, candidate_data = trader.run(state)
+        candidate_times.append(time.perf_counter() - start)
+        reference_times.append(row["elapsed"])
+
+        # Round-trip through JSON so tuples, numpy scalars etc. compare the way they were recorded.
+        candidate = json.loads(json.dumps({
+            "orders": _orders(orders), "conversions": conversions, "trader_data": candidate_data,
+        }, default=_plain))
+        for field in ("orders", "conversions", "trader_data"):
+            if candidate[field] != row[field]:
+                divergence = {"tick": i, "timestamp": int(store.timestamps[i]), "field": field,
+                              "reference": row[field], "candidate": candidate[field]}
+                return divergence, np.array(reference_times), np.array(candidate_times)
+        trader_data = row["trader_data"]
+    return None, np.array(reference_times), np.array(candidate_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    recorder = commands.add_parser("record", help="record a reference Trader's outputs")
+    recorder.add_argument("trader")
+    recorder.add_argument("golden")
+    recorder.add_argument("prices", nargs="?")
+    recorder.add_argument("trades", nargs="?")
+    recorder.add_argument("observations", nargs="?")
+    recorder.add_argument("--ticks", type=int, default=2000, help="length of the synthetic day")
+    checker = commands.add_parser("check", help="diff a candidate Trader against a golden file")
+    checker.add_argument("trader")
+    checker.add_argument("golden")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        header = {"prices": args.prices, "trades": args.trades, "observations": args.observations,
+                  "ticks": args.ticks, "trader": args.trader}
+        store = load_store(header)
+        record(load_trader(args.trader), store, args.golden, header)
+        print(f"recorded {len(store)} ticks of {args.trader} to {args.golden}")
+        return
+
+    header, rows = read(args.golden)
+    store = load_store(header)
+    divergence, reference, candidate = check(load_trader(args.trader), store, rows)
+    if divergence is not None:
+        print(f"diverged at tick {divergence['tick']} (timestamp {divergence['timestamp']}) in {divergence['field']}")
+        print(f"  reference: {divergence['reference']}")
+        print(f"  candidate: {divergence['candidate']}")
+    else:
+        print(f"identical over {len(candidate)} ticks")
+    saved = reference.mean() - candidate.mean() if len(candidate) else 0.0
+    print(f"per tick: reference {reference.mean() * 1e3:.3f} ms, candidate {candidate.mean() * 1e3:.3f} ms, "
+          f"saved {saved * 1e3:.3f} ms ({saved / reference.mean() * 100 if reference.mean() else 0.0:.1f}%) "
+          f"over {len(candidate)} ticks compared")
+    raise SystemExit(1 if divergence is not None else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Parse a log downloaded from the Prosperity platform and optionally re-replay it locally.
+
+    python -m backtester.logs submission.log [--trader round4/tariffs.py]
+
+The log has three sections: "Sandbox logs:" (one JSON object per tick with our print
+output in lambdaLog), "Activities log:" (the prices CSV plus profit_and_loss) and
+"Trade History:" (a JSON-like list of every trade, ours marked SUBMISSION). The file is
+read line by line and each section goes straight into columnar arrays. Logs saved in the
+newer single-JSON layout (activitiesLog / logs / tradeHistory keys) are also accepted,
+though those have to be loaded whole.
+
+With --trader the activities and market trades are replayed through that Trader and its
+local PnL is printed next to the platform's.
+"""
+import argparse
+import itertools
+import json
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from datamodel import Trade, TradingState
+from backtester.engine import SUBMISSION, load_trader, run_backtest
+from backtester.replay import ReplayStore, TradeColumns, parse_rows
+
+
+def _trade_objects(lines: Iterator[str]) -> Iterator[Dict[str, str]]:
+    """
+    Trade History entries one at a time. The platform writes them with trailing commas,
+    so they are read as "key": value lines rather than with json.
+    """
+    trade: Dict[str, str] = {}
+    for line in lines:
+        line = line.strip()
+        if line.startswith("{"):
+            trade = {}
+        elif line.startswith("}"):
+            yield trade
+        elif ":" in line:
+            key, value = line.split(":", 1)
+            trade[key.strip().strip('"')] = value.strip().rstrip(",").strip('"')
+
+
+def _trade_columns(trades: Iterator[Dict[str, str]]) -> Tuple[TradeColumns, TradeColumns]:
+    """
+    Split trades into (market trades, own trades).
+    """
+    market = ([], [], [], [], [], [])
+    own = ([], [], [], [], [], [])
+    for trade in trades:
+        columns = own if SUBMISSION in (trade.get("buyer"), trade.get("seller")) else market
+        columns[0].append(int(trade["timestamp"]))
+        columns[1].append(trade["symbol"])
+        columns[2].append(float(trade["price"]))
+        columns[3].append(int(float(trade["quantity"])))
+        columns[4].append(trade.get("buyer") or "")
+        columns[5].append(trade.get("seller") or "")
+    return TradeColumns(*market), TradeColumns(*own)
+
+
+class ExchangeLog:
+    """
+    One platform log in columnar form.
+
+    `store` holds the activities as a ReplayStore whose trades are the market trades only,
+    so it can be replayed through any Trader; `own_trades` are our fills, `pnl[product]` the
+    platform's running profit_and_loss aligned with store.timestamps, and
+    `log_timestamps`/`lambda_logs`/`sandbox_logs` the per-tick print output.
+    """
+
+    def __init__(self, store: ReplayStore, own_trades: TradeColumns, pnl: Dict[str, np.ndarray],
+                 log_timestamps: np.ndarray, lambda_logs: np.ndarray, sandbox_logs: np.ndarray):
+        self.store = store
+        self.own_trades = own_trades
+        self.pnl = pnl
+        self.log_timestamps = log_timestamps
+        self.lambda_logs = lambda_logs
+        self.sandbox_logs = sandbox_logs
+
+    @classmethod
+    def parse(cls, path: str) -> "ExchangeLog":
+        with open(path, newline="") as f:
+            # Section logs start with "Sandbox logs:", the single-JSON layout with "{".
+            single_json = f.read(64).lstrip().startswith("{")
+            f.seek(0)
+            return cls._from_json(json.load(f)) if single_json else cls._from_lines(f)
+
+    @classmethod
+    def _from_lines(cls, lines: Iterator[str]) -> "ExchangeLog":
+        log_timestamps, lambda_logs, sandbox_logs = [], [], []
+        activities = None
+        pnl_rows: List[tuple] = []
+        trades = (TradeColumns.empty(), TradeColumns.empty())
+        buffer: List[str] = []
+        for line in lines:
+            if line.startswith("Activities log:"):
+                section = itertools.takewhile(lambda l: l.strip(), lines)
+                activities = ReplayStore.from_rows(cls._recording_pnl(parse_rows(section), pnl_rows))
+            elif line.startswith("Trade History:"):
+                trades = _trade_columns(_trade_objects(lines))
+            elif line.startswith("{"):
+                buffer = [line]
+            elif buffer:
+                buffer.append(line)
+                if line.startswith("}"):
+                    entry = json.loads("".join(buffer))
+                    buffer = []
+                    log_timestamps.append(int(entry.get("timestamp", 0)))
+                    lambda_logs.append(entry.get("lambdaLog", ""))
+                    sandbox_logs.append(entry.get("sandboxLog", ""))
+        return cls._assemble(activities, trades, pnl_rows, log_timestamps, lambda_logs, sandbox_logs)
+
+    @classmethod
+    def _from_json(cls, data: dict) -> "ExchangeLog":
+        pnl_rows: List[tuple] = []
+        rows = parse_rows(iter(data.get("activitiesLog", "").splitlines()))
+        activities = ReplayStore.from_rows(cls._recording_pnl(rows, pnl_rows))
+        trades = _trade_columns({k: str(v) for k, v in t.items()} for t in data.get("tradeHistory", []))
+        entries = data.get("logs", [])
+        return cls._assemble(
+            activities, trades, pnl_rows, [int(e.get("timestamp", 0)) for e in entries],
+            [e.get("lambdaLog", "") for e in entries], [e.get("sandboxLog", "") for e in entries],
+        )
+
+    @staticmethod
+    def _recording_pnl(rows: Iterator[Dict[str, str]], sink: List[tuple]) -> Iterator[Dict[str, str]]:
+        """
+        Pass activities rows through while keeping their profit_and_loss column.
+        """
+        for row in rows:
+            sink.append((int(row["timestamp"]), row["product"], float(row.get("profit_and_loss") or 0.0)))
+            yield row
+
+    @classmethod
+    def _assemble(cls, activities, trades, pnl_rows, log_timestamps, lambda_logs, sandbox_logs) -> "ExchangeLog":
+        store = activities if activities is not None else ReplayStore(np.zeros(0, dtype=np.int64), {})
+        store.trades = trades[0]
+        pnl = {p: np.zeros(len(store)) for p in store.products}
+        for timestamp, product, value in pnl_rows:
+            pnl[product][np.searchsorted(store.timestamps, timestamp)] = value
+        return cls(store, trades[1], pnl, np.array(log_timestamps, dtype=np.int64),
+                   np.array(lambda_logs, dtype=object), np.array(sandbox_logs, dtype=object))
+
+    def positions(self) -> Dict[str, np.ndarray]:
+        """
+        Our position per product at the start of every tick, rebuilt from own trades.
+        """
+        own = self.own_trades
+        signed = np.where(own.buyers == SUBMISSION, own.quantities, -own.quantities)
+        positions = {}
+        for product in set(own.symbols):
+            rows = own.symbols == product
+            # Fills at a tick's timestamp are reflected from the next tick on.
+            ticks = np.searchsorted(self.store.timestamps, own.timestamps[rows], side="right")
+            change = np.bincount(ticks, weights=signed[rows], minlength=len(self.store) + 1)[:len(self.store)]
+            positions[product] = np.cumsum(change).astype(np.int64)
+        return positions
+
+    def states(self) -> Iterator[TradingState]:
+        """
+        The TradingStates the platform sent, with positions and own trades rebuilt from the
+        trade history. traderData is not in the log and is left empty.
+        """
+        positions = self.positions()
+        own = self.own_trades
+        timestamps = self.store.timestamps
+        for i in range(len(timestamps)):
+            own_trades: Dict[str, List[Trade]] = {}
+            if i > 0:
+                lo, hi = np.searchsorted(own.timestamps, [timestamps[i - 1], timestamps[i]], side="left")
+                for j in range(lo, hi):
+                    own_trades.setdefault(own.symbols[j], []).append(Trade(
+                        own.symbols[j], int(own.prices[j]), int(own.quantities[j]),
+                        own.buyers[j], own.sellers[j], int(own.timestamps[j]),
+                    ))
+            position = {p: int(v[i]) for p, v in positions.items() if v[i]}
+            yield self.store.state(i, "", position, own_trades)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="log file downloaded from the platform")
+    parser.add_argument("--trader", help="round file defining Trader to re-replay the day with")
+    args = parser.parse_args()
+
+    log = ExchangeLog.parse(args.log)
+    store = log.store
+    print(f"{len(store)} ticks, {len(store.products)} products, {len(store.trades)} market trades, "
+          f"{len(log.own_trades)} own trades, {len(log.lambda_logs)} log entries")
+    local = run_backtest(load_trader(args.trader), store).pnl() if args.trader else {}
+    print(f"{'product':<30} {'platform':>12}" + (f" {'local':>12}" if args.trader else ""))
+    for product in store.products:
+        platform = log.pnl[product][-1] if len(store) else 0.0
+        row = f"{product:<30} {platform:>12.1f}"
+        if args.trader:
+            row += f" {local.get(product, 0.0):>12.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import csv
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from datamodel import ConversionObservation, Observation, OrderDepth, Trade, TradingState
+
+# The prices files carry three book levels per side.
+LEVELS = 3
+# Fields of ConversionObservation, in constructor order.
+OBSERVATION_FIELDS = ("bidPrice", "askPrice", "transportFees", "exportTariff", "importTariff", "sugarPrice", "sunlightIndex")
+
+
+def parse_rows(lines: Iterator[str]) -> Iterator[Dict[str, str]]:
+    """
+    Rows of a Prosperity CSV given as lines (header first) as dicts; handles both ';' and ','
+    separated data.
+    """
+    header = next(lines, "")
+    delimiter = ";" if header.count(";") > header.count(",") else ","
+    names = [name.strip() for name in header.strip().split(delimiter)]
+    for row in csv.reader(lines, delimiter=delimiter):
+        if row:
+            yield dict(zip(names, row))
+
+
+def _open_rows(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream rows of a Prosperity CSV file as dicts.
+    """
+    with open(path, newline="") as f:
+        yield from parse_rows(f)
+
+
+def _number(value: str) -> float:
+    return float(value) if value not in ("", None) else np.nan
+
+
+def load_observations(path: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Conversion observations file as (timestamps, {field: values}).
+    """
+    timestamps = []
+    fields = {name: [] for name in OBSERVATION_FIELDS}
+    for row in _open_rows(path):
+        timestamps.append(int(row["timestamp"]))
+        for name in OBSERVATION_FIELDS:
+            fields[name].append(_number(row.get(name)))
+    return np.array(timestamps, dtype=np.int64), {name: np.array(values) for name, values in fields.items()}
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """
+    Carry the last non-NaN value forward; leading NaNs stay NaN.
+    """
+    index = np.where(np.isnan(values), 0, np.arange(len(values)))
+    np.maximum.accumulate(index, out=index)
+    return values[index]
+
+
+class ProductSeries:
+    """
+    Columnar book history of one product, aligned with ReplayStore.timestamps.
+    Missing levels have NaN prices and zero volume; ask volumes are positive.
+    """
+
+    def __init__(self, n: int):
+        self.bid_prices = np.full((n, LEVELS), np.nan)
+        self.bid_volumes = np.zeros((n, LEVELS), dtype=np.int64)
+        self.ask_prices = np.full((n, LEVELS), np.nan)
+        self.ask_volumes = np.zeros((n, LEVELS), dtype=np.int64)
+        self.mid = np.full(n, np.nan)
+
+
+class TradeColumns:
+    """
+    Market trades of a day as parallel arrays sorted by timestamp.
+    """
+
+    def __init__(self, timestamps, symbols, prices, quantities, buyers, sellers):
+        order = np.argsort(np.asarray(timestamps, dtype=np.int64), kind="stable")
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)[order]
+        self.symbols = np.asarray(symbols, dtype=object)[order]
+        self.prices = np.asarray(prices, dtype=float)[order]
+        self.quantities = np.asarray(quantities, dtype=np.int64)[order]
+        self.buyers = np.asarray(buyers, dtype=object)[order]
+        self.sellers = np.asarray(sellers, dtype=object)[order]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def empty(cls) -> "TradeColumns":
+        return cls([], [], [], [], [], [])
+
+    @classmethod
+    def from_csv(cls, path: str) -> "TradeColumns":
+        columns = ([], [], [], [], [], [])
+        for row in _open_rows(path):
+            columns[0].append(int(row["timestamp"]))
+            columns[1].append(row["symbol"])
+            columns[2].append(float(row["price"]))
+            columns[3].append(int(float(row["quantity"])))
+            columns[4].append(row.get("buyer") or "")
+            columns[5].append(row.get("seller") or "")
+        return cls(*columns)
+
+    def between(self, start: int, end: int) -> Dict[str, List[Trade]]:
+        """
+        Trades with start <= timestamp < end, grouped by symbol as in TradingState.market_trades.
+        """
+        lo = np.searchsorted(self.timestamps, start, side="left")
+        hi = np.searchsorted(self.timestamps, end, side="left")
+        trades: Dict[str, List[Trade]] = {}
+        for j in range(lo, hi):
+            symbol = self.symbols[j]
+            trades.setdefault(symbol, []).append(Trade(
+                symbol, int(self.prices[j]), int(self.quantities[j]),
+                self.buyers[j], self.sellers[j], int(self.timestamps[j]),
+            ))
+        return trades
+
+
+class ReplayStore:
+    """
+    One day of historical data in columnar form: book levels per product, market trades and
+    conversion observations, all aligned on a shared timestamp grid.
+
+    `states()` rebuilds the TradingStates the exchange would have sent, so a Trader can be
+    replayed; analyses read the arrays directly.
+    """
+
+    def __init__(self, timestamps: np.ndarray, series: Dict[str, ProductSeries], trades: TradeColumns = None,
+                 observations: Dict[str, Dict[str, np.ndarray]] = None, day: int = 0):
+        self.timestamps = timestamps
+        self.series = series
+        self.trades = TradeColumns.empty() if trades is None else trades
+        # observations[product][field] is aligned with timestamps (NaN where missing).
+        self.observations = {} if observations is None else observations
+        self.day = day
+
+    @property
+    def products(self) -> List[str]:
+        return list(self.series)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_csv(cls, prices_path: str, trades_path: str = None, observations_path: str = None,
+                 observation_product: str = "MAGNIFICENT_MACARONS") -> "ReplayStore":
+        """
+        Load a prices file (plus optional trades and observations files) for one day.
+        """
+        trades = TradeColumns.from_csv(trades_path) if trades_path else None
+        store = cls.from_rows(_open_rows(prices_path), trades)
+        if observations_path:
+            observed_at, values = load_observations(observations_path)
+            fields = {name: np.full(len(store), np.nan) for name in OBSERVATION_FIELDS}
+            positions = np.searchsorted(store.timestamps, observed_at)
+            matched = positions < len(store)
+            matched[matched] &= store.timestamps[positions[matched]] == observed_at[matched]
+            for name in OBSERVATION_FIELDS:
+                fields[name][positions[matched]] = values[name][matched]
+            store.observations = {observation_product: fields}
+        return store
+
+    @classmethod
+    def from_rows(cls, price_rows: Iterator[Dict[str, str]], trades: TradeColumns = None) -> "ReplayStore":
+        """
+        Build a store from prices rows (dicts keyed by the prices file header).
+        """
+        rows: Dict[str, List[tuple]] = {}
+        day = 0
+        for row in price_rows:
+            day = int(float(row.get("day") or 0))
+            levels = tuple(
+                (_number(row[f"bid_price_{k}"]), _number(row[f"bid_volume_{k}"]),
+                 _number(row[f"ask_price_{k}"]), _number(row[f"ask_volume_{k}"]))
+                for k in range(1, LEVELS + 1)
+            )
+            rows.setdefault(row["product"], []).append((int(row["timestamp"]), levels, _number(row.get("mid_price"))))
+
+        timestamps = np.array(sorted({r[0] for product_rows in rows.values() for r in product_rows}), dtype=np.int64)
+        series: Dict[str, ProductSeries] = {}
+        for product, product_rows in rows.items():
+            s = series[product] = ProductSeries(len(timestamps))
+            positions = np.searchsorted(timestamps, [r[0] for r in product_rows])
+            for i, (_, levels, mid) in zip(positions, product_rows):
+                for k, (bid, bid_volume, ask, ask_volume) in enumerate(levels):
+                    if not np.isnan(bid):
+                        s.bid_prices[i, k] = bid
+                        s.bid_volumes[i, k] = int(bid_volume)
+                    if not np.isnan(ask):
+                        s.ask_prices[i, k] = ask
+                        s.ask_volumes[i, k] = abs(int(ask_volume))
+                s.mid[i] = mid
+        return cls(timestamps, series, trades, None, day)
+
+    def mids(self, products: List[str] = None) -> np.ndarray:
+        """
+        Mid prices as a (ticks, products) matrix.
+        """
+        products = self.products if products is None else products
+        return np.column_stack([self.series[p].mid for p in products])
+
+    def order_depths(self, i: int) -> Dict[str, OrderDepth]:
+        depths: Dict[str, OrderDepth] = {}
+        for product, s in self.series.items():
+            od = OrderDepth()
+            for k in range(LEVELS):
+                if not np.isnan(s.bid_prices[i, k]):
+                    od.buy_orders[int(s.bid_prices[i, k])] = int(s.bid_volumes[i, k])
+                if not np.isnan(s.ask_prices[i, k]):
+                    od.sell_orders[int(s.ask_prices[i, k])] = -int(s.ask_volumes[i, k])
+            if od.buy_orders or od.sell_orders:
+                depths[product] = od
+        return depths
+
+    def observation(self, i: int) -> Observation:
+        conversions = {}
+        for product, fields in self.observations.items():
+            if not np.isnan(fields["bidPrice"][i]):
+                conversions[product] = ConversionObservation(*(float(fields[name][i]) for name in OBSERVATION_FIELDS))
+        return Observation({}, conversions)
+
+    def state(self, i: int, trader_data: str = "", position: Dict[str, int] = None,
+              own_trades: Dict[str, List[Trade]] = None) -> TradingState:
+        """
+        The TradingState for tick i. Market trades are those printed during the previous tick.
+        """
+        market_trades = self.trades.between(self.timestamps[i - 1], self.timestamps[i]) if i > 0 else {}
+        return TradingState(
+            trader_data, int(self.timestamps[i]), {}, self.order_depths(i), own_trades or {},
+            market_trades, dict(position or {}), self.observation(i),
+        )
+
+    def states(self) -> Iterator[TradingState]:
+        """
+        Every tick's TradingState with no positions or own trades (for stateless replays).
+        """
+        for i in range(len(self.timestamps)):
+            yield self.state(i)
+
+    @classmethod
+    def synthetic(cls, mids: Dict[str, float], ticks: int = 10000, volatility: float = 0.0005,
+                  spread: int = 2, seed: int = 0) -> "ReplayStore":
+        """
+        Random-walk day for benchmarks when no historical files are at hand.
+        """
+        rng = np.random.default_rng(seed)
+        timestamps = np.arange(ticks, dtype=np.int64) * 100
+        series: Dict[str, ProductSeries] = {}
+        for product, start in mids.items():
+            s = series[product] = ProductSeries(ticks)
+            path = start * np.exp(np.cumsum(rng.normal(0.0, volatility, ticks)))
+            best_bid = np.floor(path - spread / 2)
+            for k in range(LEVELS):
+                s.bid_prices[:, k] = best_bid - k
+                s.ask_prices[:, k] = best_bid + spread + k
+                s.bid_volumes[:, k] = rng.integers(1, 30, ticks)
+                s.ask_volumes[:, k] = rng.integers(1, 30, ticks)
+            s.mid = (s.bid_prices[:, 0] + s.ask_prices[:, 0]) / 2.0
+        return cls(timestamps, series)
@@ -0,0 +1,166 @@
+"""
+Scan every product pair (and each basket against its synthetic) for relative-value structure.
+
+    python -m backtester.scanner [prices_day_1.csv prices_day_2.csv ...] [--max-lag 20] [--workers 4]
+
+For each pair it reports:
+    corr      correlation of one-tick mid returns
+    eg_t      Engle-Granger statistic: Dickey-Fuller t of the residual of mid_a = alpha + beta * mid_b
+              (more negative is more cointegrated; about -3.34 is the 5% level for one regressor)
+    beta      the hedge ratio of that regression
+    half_life mean-reversion half-life of the residual, in ticks
+    lag       the lag in [-max_lag, max_lag] with the largest |cross-correlation| of returns;
+              a positive lag means a leads b by that many ticks
+Days are concatenated in the order given. Pairs are split across a process pool; the mid
+matrix is sent to each worker once. Without files a synthetic day is scanned.
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from backtester.attribution import SYNTHETIC_MIDS
+from backtester.replay import ReplayStore, forward_fill
+
+# Basket compositions from the round 2 rules.
+BASKETS: Dict[str, Dict[str, int]] = {
+    "PICNIC_BASKET1": {"CROISSANTS": 6, "JAMS": 3, "DJEMBES": 1},
+    "PICNIC_BASKET2": {"CROISSANTS": 4, "JAMS": 2},
+}
+# Engle-Granger critical values (one regressor, with constant).
+EG_CRITICAL = {0.01: -3.90, 0.05: -3.34, 0.10: -3.04}
+
+# Set in each worker by _init_worker so tasks only carry column indices.
+_MIDS: np.ndarray = None
+_MAX_LAG = 0
+
+
+def _init_worker(mids: np.ndarray, max_lag: int):
+    global _MIDS, _MAX_LAG
+    _MIDS = mids
+    _MAX_LAG = max_lag
+
+
+def engle_granger(a: np.ndarray, b: np.ndarray) -> Tuple[float, float, float]:
+    """
+    (Dickey-Fuller t statistic, beta, half-life) for the residual of a = alpha + beta * b.
+    """
+    b_centred = b - b.mean()
+    variance = b_centred @ b_centred
+    beta = (b_centred @ (a - a.mean())) / variance if variance > 0 else 0.0
+    residual = a - a.mean() - beta * b_centred
+    lagged = residual[:-1]
+    change = np.diff(residual)
+    denominator = lagged @ lagged
+    if denominator <= 0 or len(change) < 3:
+        return 0.0, float(beta), float("inf")
+    gamma = (lagged @ change) / denominator
+    errors = change - gamma * lagged
+    standard_error = np.sqrt((errors @ errors) / (len(change) - 1) / denominator)
+    t = gamma / standard_error if standard_error > 0 else 0.0
+    if gamma <= -1:
+        half_life = 0.0
+    else:
+        half_life = -np.log(2) / np.log1p(gamma) if gamma < 0 else float("inf")
+    return float(t), float(beta), float(half_life)
+
+
+def lead_lag(x: np.ndarray, y: np.ndarray, max_lag: int) -> Tuple[int, float]:
+    """
+    Lag with the largest |corr(x[t], y[t + lag])| and that correlation, via one FFT.
+    """
+    n = len(x)
+    x = (x - x.mean()) / (x.std() or 1.0)
+    y = (y - y.mean()) / (y.std() or 1.0)
+    size = 1 << (2 * n - 1).bit_length()
+    cross = np.fft.irfft(np.conj(np.fft.rfft(x, size)) * np.fft.rfft(y, size), size)
+    # cross[lag] = sum x[t] * y[t + lag]; negative lags wrap to the end.
+    lags = np.arange(-max_lag, max_lag + 1)
+    values = cross[lags % size] / (n - np.abs(lags))
+    best = int(np.argmax(np.abs(values)))
+    return int(lags[best]), float(values[best])
+
+
+def _scan_pairs(pairs: Sequence[Tuple[int, int]]) -> List[tuple]:
+    rows = []
+    for i, j in pairs:
+        a, b = _MIDS[:, i], _MIDS[:, j]
+        valid = np.isfinite(a) & np.isfinite(b)
+        a, b = a[valid], b[valid]
+        if len(a) < 3:
+            continue
+        returns_a, returns_b = np.diff(np.log(a)), np.diff(np.log(b))
+        correlation = np.corrcoef(returns_a, returns_b)[0, 1] if returns_a.std() and returns_b.std() else 0.0
+        t, beta, half_life = engle_granger(a, b)
+        lag, lag_correlation = lead_lag(returns_a, returns_b, _MAX_LAG)
+        rows.append((i, j, float(correlation), t, beta, half_life, lag, lag_correlation))
+    return rows
+
+
+def mid_matrix(stores: Sequence[ReplayStore], products: List[str] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Forward-filled top-of-book mids of every day stacked into one (ticks, products) matrix,
+    with a synthetic column per basket whose components are all present.
+    """
+    products = products or sorted({p for store in stores for p in store.products})
+    blocks = []
+    for store in stores:
+        columns = []
+        for product in products:
+            s = store.series.get(product)
+            columns.append(forward_fill((s.bid_prices[:, 0] + s.ask_prices[:, 0]) / 2.0) if s is not None
+                           else np.full(len(store), np.nan))
+        blocks.append(np.column_stack(columns))
+    mids = np.vstack(blocks)
+    names = list(products)
+    for basket, components in BASKETS.items():
+        if basket in products and all(c in products for c in components):
+            synthetic = sum(weight * mids[:, products.index(c)] for c, weight in components.items())
+            mids = np.column_stack([mids, synthetic])
+            names.append(f"SYNTHETIC_{basket}")
+    return names, mids
+
+
+def scan(names: List[str], mids: np.ndarray, max_lag: int = 20, workers: int = None) -> List[tuple]:
+    """
+    (a, b, corr, eg_t, beta, half_life, lag, lag_corr) for every pair, most cointegrated first.
+    """
+    pairs = list(itertools.combinations(range(len(names)), 2))
+    workers = workers or 1
+    chunks = [pairs[k::workers] for k in range(workers)]
+    if workers == 1:
+        _init_worker(mids, max_lag)
+        results = [_scan_pairs(chunks[0])]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(mids, max_lag)) as pool:
+            results = list(pool.map(_scan_pairs, chunks))
+    rows = [(names[row[0]], names[row[1]]) + row[2:] for chunk in results for row in chunk]
+    rows.sort(key=lambda row: row[3])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="*", help="prices CSVs, one per day")
+    parser.add_argument("--max-lag", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--top", type=int, default=30, help="rows to print")
+    args = parser.parse_args()
+
+    if args.prices:
+        stores = [ReplayStore.from_csv(path) for path in args.prices]
+    else:
+        stores = [ReplayStore.synthetic(SYNTHETIC_MIDS)]
+    names, mids = mid_matrix(stores)
+    rows = scan(names, mids, args.max_lag, args.workers or os.cpu_count())
+
+    print(f"{'a':<28} {'b':<28} {'corr':>6} {'eg_t':>7} {'beta':>8} {'half_life':>9} {'lag':>4} {'lag_corr':>8}")
+    for a, b, correlation, t, beta, half_life, lag, lag_correlation in rows[:args.top]:
+        flag = "*" if t < EG_CRITICAL[0.05] else " "
+        print(f"{a:<28} {b:<28} {correlation:>6.3f} {t:>7.2f}{flag}{beta:>8.3f} {half_life:>9.1f} {lag:>4} {lag_correlation:>8.3f}")
+    print("* cointegrated at the 5% level")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Measure how well the SignalTracker signals predict mid moves over the next k ticks.
+
+    python -m backtester.signal_eval [prices.csv trades.csv] [--products KELP SQUID_INK] [--k 1 5 10 20]
+
+Signals are rebuilt for the whole day in vectorised form (matching trading.signals tick for
+tick) and compared with forward returns mid[t + k] / mid[t] - 1. For every signal and
+horizon it reports the information coefficient (Pearson correlation) and the hit rate of
+sign(signal) == sign(forward return) over ticks where both are non-zero.
+Without files a synthetic day is used.
+"""
+import argparse
+from typing import Dict, Sequence
+import numpy as np
+from backtester.replay import ReplayStore, TradeColumns, forward_fill
+
+SIGNALS = ("imbalance", "flow", "returns")
+
+
+def signal_series(store: ReplayStore, product: str, levels: int = 3, horizon: int = 5,
+                  window: int = 10) -> Dict[str, np.ndarray]:
+    """
+    Per-tick imbalance, flow and returns for one product, plus the carried-forward mid.
+    """
+    s = store.series[product]
+    n = len(store)
+    bid_volume = s.bid_volumes[:, :levels].sum(axis=1).astype(float)
+    ask_volume = s.ask_volumes[:, :levels].sum(axis=1).astype(float)
+    total = bid_volume + ask_volume
+    imbalance = np.divide(bid_volume - ask_volume, total, out=np.zeros(n), where=total > 0)
+
+    mid = forward_fill((s.bid_prices[:, 0] + s.ask_prices[:, 0]) / 2.0)
+
+    # Trades printed in [t[i-1], t[i]) arrive at tick i and are signed against mid[i-1].
+    trades = store.trades
+    mask = trades.symbols == product
+    arrival = np.searchsorted(store.timestamps, trades.timestamps[mask], side="right")
+    valid = (arrival > 0) & (arrival < n)
+    arrival = arrival[valid]
+    reference = mid[arrival - 1]
+    sides = np.sign(trades.prices[mask][valid] - reference)
+    sides[np.isnan(sides)] = 0
+    tick_flow = np.bincount(arrival, weights=sides * trades.quantities[mask][valid], minlength=n)
+    cumulative = np.cumsum(tick_flow)
+    flow = cumulative.copy()
+    flow[window:] -= cumulative[:-window]
+
+    returns = np.zeros(n)
+    if n > horizon:
+        ratio = mid[horizon:] / mid[:-horizon] - 1
+        returns[horizon:] = np.where(np.isnan(ratio), 0.0, ratio)
+    return {"imbalance": imbalance, "flow": flow, "returns": returns, "mid": mid}
+
+
+def forward_returns(mid: np.ndarray, ks: Sequence[int]) -> np.ndarray:
+    """
+    (len(ks), ticks) matrix of mid[t + k] / mid[t] - 1; NaN where t + k is past the end.
+    """
+    out = np.full((len(ks), len(mid)), np.nan)
+    for row, k in enumerate(ks):
+        out[row, :len(mid) - k] = mid[k:] / mid[:-k] - 1
+    return out
+
+
+def predictive_power(signals: np.ndarray, targets: np.ndarray):
+    """
+    Information coefficient and hit rate of every signal row against every target row,
+    as two (signals, targets) matrices.
+    """
+    valid = np.isfinite(targets)[None, :, :] & np.isfinite(signals)[:, None, :]
+    x = np.where(valid, signals[:, None, :], 0.0)
+    y = np.where(valid, targets[None, :, :], 0.0)
+    count = valid.sum(axis=2)
+    x_mean = x.sum(axis=2) / np.maximum(count, 1)
+    y_mean = y.sum(axis=2) / np.maximum(count, 1)
+    x_centred = np.where(valid, x - x_mean[..., None], 0.0)
+    y_centred = np.where(valid, y - y_mean[..., None], 0.0)
+    covariance = (x_centred * y_centred).sum(axis=2)
+    scale = np.sqrt((x_centred ** 2).sum(axis=2) * (y_centred ** 2).sum(axis=2))
+    ic = np.divide(covariance, scale, out=np.zeros_like(covariance), where=scale > 0)
+
+    signed = np.sign(x) * np.sign(y)
+    decided = signed != 0
+    hit_rate = np.divide((signed > 0).sum(axis=2), decided.sum(axis=2),
+                         out=np.full(ic.shape, np.nan), where=decided.sum(axis=2) > 0)
+    return ic, hit_rate
+
+
+def evaluate(store: ReplayStore, products: Sequence[str], ks: Sequence[int] = (1, 5, 10, 20),
+             levels: int = 3, horizon: int = 5, window: int = 10) -> Dict[str, tuple]:
+    """
+    {product: (ic, hit_rate)} with rows in SIGNALS order and columns in ks order.
+    """
+    results = {}
+    for product in products:
+        series = signal_series(store, product, levels, horizon, window)
+        signals = np.vstack([series[name] for name in SIGNALS])
+        results[product] = predictive_power(signals, forward_returns(series["mid"], ks))
+    return results
+
+
+def synthetic_day(ticks: int = 10000, seed: int = 0) -> ReplayStore:
+    """
+    Random-walk KELP/SQUID_INK books with trades printed at the touch.
+    """
+    store = ReplayStore.synthetic({"KELP": 2030, "SQUID_INK": 1900}, ticks=ticks, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    columns = ([], [], [], [], [], [])
+    for product, s in store.series.items():
+        ticks_with_trades = np.flatnonzero(rng.random(ticks) < 0.1)
+        buys = rng.random(len(ticks_with_trades)) < 0.5
+        columns[0].extend(store.timestamps[ticks_with_trades])
+        columns[1].extend([product] * len(ticks_with_trades))
+        columns[2].extend(np.where(buys, s.ask_prices[ticks_with_trades, 0], s.bid_prices[ticks_with_trades, 0]))
+        columns[3].extend(rng.integers(1, 10, len(ticks_with_trades)))
+        columns[4].extend([""] * len(ticks_with_trades))
+        columns[5].extend([""] * len(ticks_with_trades))
+    store.trades = TradeColumns(*columns)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("prices", nargs="?", help="prices CSV for one day")
+    parser.add_argument("trades", nargs="?", help="trades CSV for the same day")
+    parser.add_argument("--products", nargs="+", default=["KELP", "SQUID_INK"])
+    parser.add_argument("--k", nargs="+", type=int, default=[1, 5, 10, 20])
+    parser.add_argument("--levels", type=int, default=3)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--window", type=int, default=10)
+    args = parser.parse_args()
+
+    store = ReplayStore.from_csv(args.prices, args.trades) if args.prices else synthetic_day()
+    results = evaluate(store, args.products, args.k, args.levels, args.horizon, args.window)
+    for product, (ic, hit_rate) in results.items():
+        print(product)
+        print("  signal     " + "".join(f"  k={k:<12}" for k in args.k))
+        for row, name in enumerate(SIGNALS):
+            cells = "".join(f"  {ic[row, col]:+.3f}/{hit_rate[row, col]:.2f}  " for col in range(len(args.k)))
+            print(f"  {name:<10} {cells}")
+    print("cells are IC/hit rate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Local exchange simulator: historical books, stochastic taker bots and queue-position matching.
+
+    python -m backtester.simulator round4/tariffs.py [prices.csv trades.csv [observations.csv]] [--days 8] [--workers 4]
+
+Each tick the book is seeded from the historical prices file. Our orders first cross it;
+whatever is left rests behind the historical volume already quoted at that price (ahead of
+nothing if it improves the level). Market-taker bots then arrive: per product the number
+per tick is Poisson, side and size are drawn from the day's market trades (rate, buy share
+and empirical sizes). Every bot walks the book in price-time priority, so our resting
+orders fill only once the queue ahead of them is gone. Orders live for one tick, as on
+the platform; bot trades show up as next tick's market_trades. Conversions (which need the
+observations file) settle after matching and long inventory pays storage, exactly as in
+backtester.engine.
+
+Without files the day is synthetic: random-walk KELP/SQUID_INK with printed trades plus a
+RAINFOREST_RESIN book pinned around 10000, which the market maker quotes inside.
+
+Simulated days are asyncio tasks. Each one runs a fresh Trader in a process pool, so
+several days (different seeds or different data) run at once on one box.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from datamodel import Order, Trade
+from backtester.engine import SUBMISSION, load_trader, settle_conversion, storage_charges
+from backtester.replay import ReplayStore, forward_fill
+from trading.risk import POSITION_LIMITS
+
+BOT = "BOT"
+
+
+class BotProfile:
+    """
+    Taker flow of one product: Poisson arrivals per tick, buy share and empirical sizes.
+    """
+
+    def __init__(self, rate: float, buy_share: float, sizes: np.ndarray):
+        self.rate = rate
+        self.buy_share = buy_share
+        self.sizes = sizes
+
+    def draw(self, rng: np.random.Generator) -> List[int]:
+        """
+        Signed sizes of this tick's bot market orders (+ buys, - sells).
+        """
+        count = rng.poisson(self.rate)
+        if count == 0 or len(self.sizes) == 0:
+            return []
+        sizes = rng.choice(self.sizes, count)
+        sides = np.where(rng.random(count) < self.buy_share, 1, -1)
+        return (sizes * sides).tolist()
+
+
+def calibrate(store: ReplayStore, default: BotProfile = None) -> Dict[str, BotProfile]:
+    """
+    A profile per product from the store's market trades. A trade is a bot buy if it printed
+    above the mid of the tick it happened in, a sell if below; trades at mid are split evenly.
+    """
+    default = default or BotProfile(0.1, 0.5, np.arange(1, 11))
+    trades = store.trades
+    n = len(store)
+    profiles = {}
+    for product in store.products:
+        rows = trades.symbols == product
+        if not rows.any():
+            profiles[product] = default
+            continue
+        s = store.series[product]
+        mid = forward_fill((s.bid_prices[:, 0] + s.ask_prices[:, 0]) / 2.0)
+        ticks = np.clip(np.searchsorted(store.timestamps, trades.timestamps[rows], side="right") - 1, 0, n - 1)
+        sides = np.sign(trades.prices[rows] - mid[ticks])
+        sides[np.isnan(sides)] = 0
+        buy_share = ((sides > 0).sum() + 0.5 * (sides == 0).sum()) / len(sides)
+        profiles[product] = BotProfile(rows.sum() / n, float(buy_share), trades.quantities[rows].copy())
+    return profiles
+
+
+class SimulatedExchange:
+    """
+    Runs one day: seeds each tick's book from `store`, matches the Trader's orders with
+    queue position and draws bot flow from `profiles`.
+    """
+
+    def __init__(self, store: ReplayStore, profiles: Dict[str, BotProfile], seed: int = 0,
+                 limits: Dict[str, int] = None):
+        self.store = store
+        self.profiles = profiles
+        self.rng = np.random.default_rng(seed)
+        self.limits = POSITION_LIMITS if limits is None else limits
+        self.position: Dict[str, int] = {}
+        self.cash: Dict[str, float] = {}
+        self.aggressive_volume = 0
+        self.passive_volume = 0
+        self.converted_volume = 0
+        self.storage_paid = 0.0
+
+    def _fill(self, product: str, price: int, quantity: int, timestamp: int, own_trades: Dict[str, List[Trade]]):
+        self.position[product] = self.position.get(product, 0) + quantity
+        self.cash[product] = self.cash.get(product, 0.0) - price * quantity
+        buyer, seller = (SUBMISSION, BOT) if quantity > 0 else (BOT, SUBMISSION)
+        own_trades.setdefault(product, []).append(Trade(product, price, abs(quantity), buyer, seller, timestamp))
+
+    def step(self, i: int, orders: Dict[str, List[Order]]) -> Tuple[Dict[str, List[Trade]], Dict[str, List[Trade]]]:
+        """
+        Match one tick; returns (own trades, bot trades), both stamped with this tick's timestamp.
+        """
+        timestamp = int(self.store.timestamps[i])
+        depths = self.store.order_depths(i)
+        own_trades: Dict[str, List[Trade]] = {}
+        market_trades: Dict[str, List[Trade]] = {}
+        for product, order_depth in depths.items():
+            product_orders = orders.get(product, [])
+            position = self.position.get(product, 0)
+            limit = self.limits.get(product)
+            if limit is not None and product_orders:
+                buys = sum(o.quantity for o in product_orders if o.quantity > 0)
+                sells = -sum(o.quantity for o in product_orders if o.quantity < 0)
+                if position + buys > limit or position - sells < -limit:
+                    product_orders = []
+
+            # price -> [historical volume ahead, our resting volume]
+            bids = {p: [v, 0] for p, v in order_depth.buy_orders.items()}
+            asks = {p: [-v, 0] for p, v in order_depth.sell_orders.items()}
+            for order in product_orders:
+                quantity = abs(order.quantity)
+                buy = order.quantity > 0
+                book, resting = (asks, bids) if buy else (bids, asks)
+                for price in sorted(book, reverse=not buy):
+                    if quantity == 0 or (price > order.price if buy else price < order.price):
+                        break
+                    filled = min(quantity, book[price][0])
+                    if filled:
+                        book[price][0] -= filled
+                        quantity -= filled
+                        self.aggressive_volume += filled
+                        self._fill(product, price, filled if buy else -filled, timestamp, own_trades)
+                if quantity:
+                    resting.setdefault(order.price, [0, 0])[1] += quantity
+
+            profile = self.profiles.get(product)
+            for size in profile.draw(self.rng) if profile is not None else []:
+                buy = size > 0
+                remaining = abs(size)
+                book = asks if buy else bids
+                for price in sorted(book, reverse=not buy):
+                    if remaining == 0:
+                        break
+                    level = book[price]
+                    from_queue = min(remaining, level[0])
+                    level[0] -= from_queue
+                    remaining -= from_queue
+                    ours = min(remaining, level[1])
+                    if ours:
+                        level[1] -= ours
+                        remaining -= ours
+                        self.passive_volume += ours
+                        self._fill(product, price, -ours if buy else ours, timestamp, own_trades)
+                    if from_queue:
+                        # Our own fills only appear in own_trades, as on the platform.
+                        buyer, seller = (BOT, "") if buy else ("", BOT)
+                        market_trades.setdefault(product, []).append(
+                            Trade(product, price, from_queue, buyer, seller, timestamp))
+        return own_trades, market_trades
+
+    def run(self, trader) -> Dict[str, float]:
+        """
+        Drive trader.run over the whole day; returns PnL per product marked at the last mid.
+        """
+        own_trades: Dict[str, List[Trade]] = {}
+        market_trades: Dict[str, List[Trade]] = {}
+        trader_data = ""
+        for i in range(len(self.store)):
+            state = self.store.state(i, trader_data, self.position, own_trades)
+            state.market_trades = market_trades
+            with contextlib.redirect_stdout(io.StringIO()):
+                orders, conversions, trader_data = trader.run(state)
+            own_trades, market_trades = self.step(i, orders)
+            conversion = settle_conversion(conversions, state.observations.conversionObservations, self.position)
+            if conversion is not None:
+                product, price, quantity = conversion
+                self.position[product] = self.position.get(product, 0) + quantity
+                self.cash[product] = self.cash.get(product, 0.0) - price * quantity
+                self.converted_volume += abs(quantity)
+            for product, cost in storage_charges(self.position):
+                self.cash[product] = self.cash.get(product, 0.0) - cost
+                self.storage_paid += cost
+        pnl = {}
+        for product, cash in self.cash.items():
+            mid = forward_fill(self.store.series[product].mid)[-1]
+            pnl[product] = float(cash + self.position.get(product, 0) * (0.0 if np.isnan(mid) else mid))
+        return pnl
+
+
+def synthetic_day(ticks: int = 2000, seed: int = 0) -> ReplayStore:
+    """
+    signal_eval's KELP/SQUID_INK day plus a RAINFOREST_RESIN book quoted 9996/10004 around 10000.
+    """
+    from backtester.signal_eval import synthetic_day as kelp_squid_day
+    store = kelp_squid_day(ticks, seed)
+    resin = ReplayStore.synthetic({"RAINFOREST_RESIN": 10000}, ticks=ticks, volatility=0.0, spread=8, seed=seed)
+    store.series.update(resin.series)
+    return store
+
+
+def simulate_day(trader_path: str, store: ReplayStore, profiles: Dict[str, BotProfile], seed: int) -> dict:
+    """
+    One simulated day with a fresh Trader; runs in a worker process.
+    """
+    exchange = SimulatedExchange(store, profiles, seed)
+    pnl = exchange.run(load_trader(trader_path))
+    return {"seed": seed, "pnl": pnl, "aggressive": exchange.aggressive_volume, "passive": exchange.passive_volume,
+            "converted": exchange.converted_volume, "storage": exchange.storage_paid}
+
+
+async def simulate_days(trader_path: str, days: Sequence[Tuple[ReplayStore, Dict[str, BotProfile], int]],
+                        workers: int = None) -> List[dict]:
+    """
+    Run every (store, profiles, seed) day concurrently: one asyncio task per day, each
+    executing in the process pool.
+    """
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(workers) as pool:
+        tasks = [loop.run_in_executor(pool, simulate_day, trader_path, store, profiles, seed)
+                 for store, profiles, seed in days]
+        return await asyncio.gather(*tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trader", help="round file defining Trader, e.g. round4/tariffs.py")
+    parser.add_argument("prices", nargs="?")
+    parser.add_argument("trades", nargs="?")
+    parser.add_argument("observations", nargs="?", help="conversion observations, needed to convert")
+    parser.add_argument("--days", type=int, default=4, help="simulated days (one seed each)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--ticks", type=int, default=2000, help="length of the synthetic day")
+    args = parser.parse_args()
+
+    if args.prices:
+        store = ReplayStore.from_csv(args.prices, args.trades, args.observations)
+    else:
+        store = synthetic_day(args.ticks)
+    profiles = calibrate(store)
+    for product, profile in sorted(profiles.items()):
+        print(f"{product:<30} {profile.rate:.3f} takers/tick, {profile.buy_share:.2f} buys, "
+              f"mean size {profile.sizes.mean():.1f}")
+
+    results = asyncio.run(simulate_days(args.trader, [(store, profiles, seed) for seed in range(args.days)],
+                                        args.workers))
+    totals = np.array([sum(r["pnl"].values()) for r in results])
+    for r, total in zip(results, totals):
+        print(f"seed {r['seed']}: pnl {total:10.1f}   aggressive {r['aggressive']:6d}   passive {r['passive']:6d}   "
+              f"converted {r['converted']:5d}   storage {r['storage']:8.1f}")
+    print(f"mean {totals.mean():.1f}, std {totals.std():.1f} over {len(totals)} days")
+
+
+if __name__ == "__main__":
+    main()
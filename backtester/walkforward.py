@@ -0,0 +1,191 @@
+"""
+Walk-forward evaluation of Trader parameters across days, re-tuning as each day is revealed.
+
+    python -m backtester.walkforward round4/tariffs.py [prices_day_1.csv:trades_day_1.csv ...]
+        [--param registry.specs.KELP.history_length "[50, 100, 250]"] [--window 2] [--workers 4]
+
+A parameter is a dotted path from the Trader instance; dict keys may appear in the path,
+so `registry.specs.KELP.history_length` reaches KELP's spec. Each --param gives the values
+to try as a Python literal list, and the grid is every combination of them. Without --param
+KELP's pricer is swapped for median pricers over a grid of windows and history lengths, and
+only KELP's PnL is scored unless --products says otherwise.
+
+Fold k tunes on the days before day k (the last --window of them, or all) by picking the
+parameter set with the best total PnL there, then trades day k with it out of sample.
+A parameter set's PnL on a day does not depend on the fold, so every (set, day) backtest
+runs once, spread over a process pool, and the folds are read off that matrix.
+
+The report gives, per parameter set, its mean PnL over all days (an in-sample view of the
+grid), how often it was picked, and its out-of-sample PnL (mean, std, worst) over just the
+folds it was picked for; then each fold's pick with its in-sample and out-of-sample PnL.
+Without files, synthetic days with different seeds are used.
+"""
+import argparse
+import ast
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from backtester.attribution import SYNTHETIC_MIDS
+from backtester.engine import load_trader, run_backtest
+from backtester.replay import ReplayStore
+from trading.registry import MedianPrice
+
+DEFAULT_GRID: Dict[str, List[Any]] = {
+    "registry.specs.KELP.pricer": [MedianPrice((window,), window, 10000) for window in (25, 50, 100, 200)],
+    "registry.specs.KELP.history_length": [50, 100, 250],
+}
+# Products DEFAULT_GRID tunes, scored by default when it is used.
+DEFAULT_PRODUCTS = ("KELP",)
+
+# Set in each worker by _init_worker so tasks only carry indices.
+_TRADER_PATH = ""
+_DAYS: Sequence[ReplayStore] = ()
+_PRODUCTS: Sequence[str] = ()
+
+
+def _init_worker(trader_path: str, days: Sequence[ReplayStore], products: Sequence[str]):
+    global _TRADER_PATH, _DAYS, _PRODUCTS
+    _TRADER_PATH = trader_path
+    _DAYS = days
+    _PRODUCTS = products
+
+
+def set_parameter(trader, path: str, value):
+    """
+    Assign `value` at a dotted path below `trader`, stepping into dicts by key.
+    """
+    *parents, last = path.split(".")
+    target = trader
+    for part in parents:
+        target = target[part] if isinstance(target, dict) else getattr(target, part)
+    if isinstance(target, dict):
+        target[last] = value
+    elif hasattr(target, last):
+        setattr(target, last, value)
+    else:
+        raise AttributeError(f"{path}: {type(target).__name__} has no attribute {last!r}")
+
+
+def parameter_grid(grid: Dict[str, Sequence]) -> List[Dict[str, Any]]:
+    """
+    Every combination of the grid's values, as {path: value} dicts.
+    """
+    paths = list(grid)
+    return [dict(zip(paths, values)) for values in itertools.product(*(grid[p] for p in paths))]
+
+
+def _run(task: Tuple[Dict[str, Any], int]) -> float:
+    params, day = task
+    # A fresh module per run: round files keep their specs at module level.
+    trader = load_trader(_TRADER_PATH)
+    for path, value in params.items():
+        set_parameter(trader, path, value)
+    pnl = run_backtest(trader, _DAYS[day]).pnl()
+    return sum(v for product, v in pnl.items() if not _PRODUCTS or product in _PRODUCTS)
+
+
+def pnl_matrix(trader_path: str, days: Sequence[ReplayStore], sets: List[Dict[str, Any]],
+               products: Sequence[str] = (), workers: int = None) -> np.ndarray:
+    """
+    (parameter sets, days) matrix of total PnL, restricted to `products` when given.
+    """
+    tasks = [(params, day) for params in sets for day in range(len(days))]
+    workers = workers or 1
+    if workers == 1:
+        _init_worker(trader_path, days, products)
+        values = [_run(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(trader_path, days, products)) as pool:
+            values = list(pool.map(_run, tasks))
+    return np.array(values).reshape(len(sets), len(days))
+
+
+def walk_forward(pnl: np.ndarray, window: int = None) -> List[Tuple[int, int, float, float]]:
+    """
+    (test day, chosen set, in-sample PnL per day, out-of-sample PnL) for every fold.
+    The first day is only ever used for tuning.
+    """
+    folds = []
+    for day in range(1, pnl.shape[1]):
+        start = max(0, day - window) if window else 0
+        in_sample = pnl[:, start:day].mean(axis=1)
+        best = int(np.argmax(in_sample))
+        folds.append((day, best, float(in_sample[best]), float(pnl[best, day])))
+    return folds
+
+
+def _format(value) -> str:
+    if hasattr(value, "__dict__"):
+        # Pricer objects: class name and constructor-ish fields.
+        return f"{type(value).__name__}({', '.join(f'{k}={v}' for k, v in vars(value).items())})"
+    return str(value)
+
+
+def _describe(params: Dict[str, Any]) -> str:
+    return ", ".join(f"{path}={_format(value)}" for path, value in params.items()) or "(defaults)"
+
+
+def load_days(paths: Sequence[str]) -> List[ReplayStore]:
+    days = []
+    for path in paths:
+        prices, _, trades = path.partition(":")
+        days.append(ReplayStore.from_csv(prices, trades or None))
+    return days
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trader", help="round file defining Trader, e.g. round4/tariffs.py")
+    parser.add_argument("days", nargs="*", help="prices.csv[:trades.csv] per day, in date order")
+    parser.add_argument("--param", nargs=2, action="append", metavar=("PATH", "VALUES"),
+                        help="dotted path from the Trader and a literal list of values")
+    parser.add_argument("--window", type=int, default=None, help="tune on at most this many previous days")
+    parser.add_argument("--products", nargs="*", default=None,
+                        help="only score these products' PnL (default: KELP for the default grid, else all)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--synthetic-days", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=2000, help="length of each synthetic day")
+    args = parser.parse_args()
+
+    if args.days:
+        days = load_days(args.days)
+    else:
+        days = [ReplayStore.synthetic(SYNTHETIC_MIDS, ticks=args.ticks, seed=seed)
+                for seed in range(args.synthetic_days)]
+    if len(days) < 2:
+        parser.error("walk-forward needs at least two days")
+    grid = {path: ast.literal_eval(values) for path, values in args.param} if args.param else DEFAULT_GRID
+    products = args.products if args.products is not None else (() if args.param else DEFAULT_PRODUCTS)
+    sets = parameter_grid(grid)
+
+    pnl = pnl_matrix(args.trader, days, sets, products, args.workers or os.cpu_count())
+    folds = walk_forward(pnl, args.window)
+    # Out-of-sample PnL of each set: only the days it was picked to trade.
+    out_of_sample: List[List[float]] = [[] for _ in sets]
+    for _, best, _, oos in folds:
+        out_of_sample[best].append(oos)
+
+    print(f"{len(sets)} parameter sets x {len(days)} days, {len(folds)} folds, "
+          f"scoring {', '.join(products) or 'all products'}")
+    print(f"{'set':>4} {'all_days':>10} {'picked':>6} {'oos_mean':>10} {'oos_std':>10} {'oos_worst':>10}  parameters")
+    for k in np.argsort(-pnl.mean(axis=1)):
+        row = np.array(out_of_sample[k])
+        if len(row):
+            oos = f"{row.mean():>10.1f} {row.std():>10.1f} {row.min():>10.1f}"
+        else:
+            oos = f"{'-':>10} {'-':>10} {'-':>10}"
+        print(f"{k:>4} {pnl[k].mean():>10.1f} {len(row):>6} {oos}  {_describe(sets[k])}")
+
+    print(f"\n{'day':>4} {'set':>4} {'in_sample':>10} {'oos':>10}")
+    for day, best, in_sample, oos in folds:
+        print(f"{day:>4} {best:>4} {in_sample:>10.1f} {oos:>10.1f}")
+    realised = np.array([oos for _, _, _, oos in folds])
+    print(f"walk-forward: mean {realised.mean():.1f}, std {realised.std():.1f}, total {realised.sum():.1f}; "
+          f"mean in-sample {np.mean([f[2] for f in folds]):.1f} per day")
+
+
+if __name__ == "__main__":
+    main()
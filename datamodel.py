@@ -1,7 +1,6 @@
 import json
 from typing import Dict, List
 from json import JSONEncoder
-import jsonpickle
 
 Time = int
 Symbol = str
@@ -38,6 +37,8 @@ class Observation:
         self.conversionObservations = conversionObservations
         
     def __str__(self) -> str:
+        # jsonpickle is slow to import and only needed here, so load it on first use.
+        import jsonpickle
         return "(plainValueObservations: " + jsonpickle.encode(self.plainValueObservations) + ", conversionObservations: " + jsonpickle.encode(self.conversionObservations) + ")"
      
 
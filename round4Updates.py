@@ -3,6 +3,22 @@ import statistics
 from collections import deque
 from typing import Dict, List
 from datamodel import OrderDepth, TradingState, Order
+from trading.registry import StrategyRegistry, ProductSpec, FixedPrice
+
+# Estimated fair price per product (add vouchers, macarons etc. here)
+PRODUCT_SPECS = {
+    "RAINFOREST_RESIN": ProductSpec("fairPrice", FixedPrice(10000)),
+    "KELP": ProductSpec("fairPrice", FixedPrice(10000)),
+    "SQUID_INK": ProductSpec("fairPrice", FixedPrice(10000)),
+    "CROISSANTS": ProductSpec("fairPrice", FixedPrice(10000)),
+    "DJEMBES": ProductSpec("fairPrice", FixedPrice(10000)),
+    "JAMS": ProductSpec("fairPrice", FixedPrice(10000)),
+    "PICNIC_BASKET1": ProductSpec("basketArbitrage"),
+    "PICNIC_BASKET2": ProductSpec("basketArbitrage"),
+}
+
+# Everything else we Short
+DEFAULT_SPEC = ProductSpec("fairPrice", FixedPrice(10))
 
 class Trader:
     def __init__(self):
@@ -13,6 +29,10 @@ class Trader:
         # Fix History Length
         self.historyLength = 100
         
+        # Resolve each product's strategy once into a dispatch table
+        self.registry = StrategyRegistry(PRODUCT_SPECS, DEFAULT_SPEC)
+        self.registry.bind({"fairPrice": self.fairPriceTrading}, {"basketArbitrage": self.basketArbitrageTrading})
+        
     def updatePriceHistory(self, product, buyOrders, sellOrders):
         
         # Check not Empty
@@ -34,67 +54,10 @@ class Trader:
             return midPrice
         return None
     
-    def getFairPrice(self, state, product):
-        
-        # Case on Products to price
-        if product == "RAINFOREST_RESIN":
-            
-            # Estimating rainforest_resin price
-            return 10000
-        
-        elif product == "KELP":
-
-            #if product in self.price_history and len(self.price_history[product]) > 0:
-            #    if len(self.price_history[product]) > 200:
-            #        return statistics.median(self.price_history[product][-200:])
-            return 10000
-        
-        elif product == "SQUID_INK":
-            
-            #if product in self.price_history and len(self.price_history[product]) > 0:
-            #    if len(self.price_history[product]) > 200:
-            #        return statistics.median(self.price_history[product][-200:]) / 2 + statistics.median(self.price_history[product][-100:]) / 2
-            return 10000
-        
-        elif product == "CROISSANTS":
-    
-            #if product in self.price_history and len(self.price_history[product]) > 0:
-            #    if len(self.price_history[product]) > 200:
-            #        return statistics.median(self.price_history[product][-200:])
-            return 10000
+    def getFairPrice(self, product, spec):
         
-        elif product == "DJEMBES":
-            
-            #if product in self.price_history and len(self.price_history[product]) > 0:
-            #    if len(self.price_history[product]) > 200:
-            #        return statistics.median(self.price_history[product][-200:]) / 2 + statistics.median(self.price_history[product][-100:]) / 2
-            return 10000
-        
-        elif product == "JAMS":
-        
-            #if product in self.price_history and len(self.price_history[product]) > 0:
-            #    if len(self.price_history[product]) > 200:
-            #        return statistics.median(self.price_history[product][-200:])
-            return 10000
-        
-        elif product == "PICNIC_BASKET1":
-            
-            #if product in self.price_history and len(self.price_history[product]) > 0:
-            #    if len(self.price_history[product]) > 200:
-            #        return statistics.median(self.price_history[product][-200:]) / 2 + statistics.median(self.price_history[product][-100:]) / 2
-            return 10000
-
-        elif product == "PICNIC_BASKET2":
-            
-            #if product in self.price_history and len(self.price_history[product]) > 0:
-            #    if len(self.price_history[product]) > 200:
-            #        return statistics.median(self.price_history[product][-200:]) / 2 + statistics.median(self.price_history[product][-100:]) / 2
-            return 10000
-        
-        else:
-            
-            #Short
-            return 10
+        # Ask the pricer declared in the product's spec
+        return spec.pricer(self.priceHistory.get(product), None)
         
     def findMidPrice(self,state,product,expected):
         
@@ -280,7 +243,7 @@ class Trader:
         # Update with new Orders
         return orders
     
-    def fairPriceTrading(self,state,product):
+    def fairPriceTrading(self,state,product,spec):
         
         # Setup
         orders = []
@@ -288,7 +251,7 @@ class Trader:
 
         # Update price history
         self.updatePriceHistory(product, order_depth.buy_orders, order_depth.sell_orders)
-        fair_price = self.getFairPrice(state,product)
+        fair_price = self.getFairPrice(product, spec)
         
         # Decide whether to Buy
         if order_depth.sell_orders:
@@ -330,25 +293,20 @@ class Trader:
         result = {}
         
         # Execute basket arbitrage first (since it doesn't need product iteration)
-        basket_orders = self.basketArbitrageTrading(state)
-        for order in basket_orders:
-            prod = order.symbol
-            if prod not in result:
-                result[prod] = []
-            result[prod].append(order)
+        for name, handler in self.registry.portfolio:
+            for order in handler(state):
+                prod = order.symbol
+                if prod not in result:
+                    result[prod] = []
+                result[prod].append(order)
 
-        # Process all products
-        basket_products = {"PICNIC_BASKET1", "PICNIC_BASKET2"}
-        blackScholesProducts = {"MAGNIFICENT_MACARONS"}
-        
-        for product in state.order_depths.keys():
-            if product in basket_products:
-                # Skip basket products as we already handled them
-                continue
+        # Process all products (baskets resolve to no per-product handler)
+        dispatch = self.registry.dispatch
         for product in state.order_depths.keys():
-            if product in basket_products:
+            handler, spec = dispatch.get(product) or self.registry.resolve(product)
+            if handler is None:
                 continue
-            orders = self.fairPriceTrading(state, product)
+            orders = handler(state, product, spec)
             if orders:
                 result[product] = orders
 
@@ -0,0 +1,6 @@
+"""
+Shared trading components used by the round Traders.
+
+Everything in this package must stay importable on the competition platform,
+so it only depends on the standard library, numpy and datamodel.
+"""
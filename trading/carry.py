@@ -0,0 +1,102 @@
+import math
+from typing import List, Tuple
+from datamodel import ConversionObservation, Order, OrderDepth
+from trading.conversions import STORAGE_COSTS, export_proceeds
+
+
+class CarryManager:
+    """
+    Inventory manager for a product that charges storage on long positions and can only be
+    converted `conversion_limit` units per tick.
+
+    Holding a long unit costs `storage_cost` per tick until it is gone, and a position of p
+    takes ceil(p / conversion_limit) ticks to convert away. Storage already paid is tracked
+    per unit held (`carry_per_unit`), so a long's edge is spent as it ages: a unit is only
+    worth adding or keeping while the edge left after that carry covers `horizon` more ticks
+    of holding plus the conversion queue ahead of it. That caps new longs once the position
+    has been held for a while and unwinds it when the remaining edge runs out.
+
+    An unwind follows an explicit schedule: the position is split into per-tick steps of at
+    most `conversion_limit` (`unwind_ticks` of them) when it starts, and one step is worked off
+    each tick until the position is flat. Fills that move the position off the schedule
+    re-plan the remainder.
+    """
+
+    def __init__(self, product: str, storage_cost: float = None, conversion_limit: int = 10, horizon: int = 50):
+        self.product = product
+        self.storage_cost = STORAGE_COSTS.get(product, 0.0) if storage_cost is None else storage_cost
+        self.conversion_limit = conversion_limit
+        self.horizon = horizon
+        # Storage paid on the units still held; units that leave take their share with them.
+        self.accrued = 0.0
+        self.held = 0
+        # Remaining per-tick unwind steps, empty when not unwinding.
+        self.schedule: List[int] = []
+
+    def accrue(self, position: int) -> float:
+        """
+        Charge this tick's storage on the current long; returns the amount charged.
+        """
+        held = max(position, 0)
+        if held == 0:
+            self.schedule = []
+        if held < self.held:
+            self.accrued *= held / self.held
+        self.held = held
+        charge = held * self.storage_cost
+        self.accrued += charge
+        return charge
+
+    def carry_per_unit(self) -> float:
+        return self.accrued / self.held if self.held else 0.0
+
+    def unwind_ticks(self, position: int) -> int:
+        return math.ceil(abs(position) / self.conversion_limit)
+
+    def required_edge(self, position: int) -> float:
+        """
+        Per-unit edge a long must have to cover the carry it has paid and its expected storage at this position.
+        """
+        return self.carry_per_unit() + self.storage_cost * (self.horizon + self.unwind_ticks(position))
+
+    def long_capacity(self, position: int, edge: float) -> int:
+        """
+        Units that can be added to the long side while the edge still covers the carry.
+        """
+        queue_ticks = math.floor((edge - self.carry_per_unit()) / self.storage_cost) - self.horizon
+        if queue_ticks <= 0:
+            return 0
+        return max(0, queue_ticks * self.conversion_limit - max(position, 0))
+
+    def should_unwind(self, position: int, edge: float) -> bool:
+        """
+        True while a started unwind still has steps left, or when the edge no longer covers the carry.
+        """
+        return position > 0 and (bool(self.schedule) or edge < self.required_edge(position))
+
+    def plan_unwind(self, position: int) -> List[int]:
+        """
+        Split a long into `unwind_ticks(position)` steps, each within the conversion limit.
+        """
+        steps = [self.conversion_limit] * (position // self.conversion_limit)
+        if position % self.conversion_limit:
+            steps.append(position % self.conversion_limit)
+        return steps
+
+    def unwind(self, position: int, observation: ConversionObservation, order_depth: OrderDepth) -> Tuple[List[Order], int]:
+        """
+        This tick's step of the unwind schedule: convert it if exporting beats the local bid,
+        otherwise sell it into the best bid. A step the bid cannot absorb is left in the
+        position and picked up when the schedule is re-planned.
+        """
+        if position <= 0:
+            self.schedule = []
+            return [], 0
+        if sum(self.schedule) != position:
+            self.schedule = self.plan_unwind(position)
+        step = self.schedule.pop(0)
+        best_bid = max(order_depth.buy_orders) if order_depth.buy_orders else None
+        if best_bid is None or export_proceeds(observation) >= best_bid:
+            return [], -step
+        quantity = min(step, order_depth.buy_orders[best_bid])
+        return [Order(self.product, best_bid, -quantity)], 0
@@ -0,0 +1,96 @@
+import math
+from typing import List, Tuple
+from datamodel import ConversionObservation, Order, OrderDepth
+
+# Storage charged per long unit per tick, by product; shorts and other products are free.
+STORAGE_COSTS = {"MAGNIFICENT_MACARONS": 0.1}
+
+
+def import_cost(observation: ConversionObservation) -> float:
+    """
+    Price paid per unit when converting a short position by buying abroad.
+    """
+    return observation.askPrice + observation.transportFees + observation.importTariff
+
+
+def export_proceeds(observation: ConversionObservation) -> float:
+    """
+    Price received per unit when converting a long position by selling abroad.
+    """
+    return observation.bidPrice - observation.transportFees - observation.exportTariff
+
+
+class ConversionArbitrage:
+    """
+    Arbitrages a product's local book against its conversion channel.
+
+    Each tick it
+      1. converts the position opened last tick, but only if converting beats unwinding at
+         the local touch (positive conversions buy abroad to cover a short, negative ones
+         sell abroad to reduce a long), at most `conversion_limit` units;
+      2. takes local bids above the import cost (sell here, import next tick) and local asks
+         below the export proceeds (buy here, export next tick), at least `min_edge` away;
+      3. optionally rests a passive ask `passive_edge` above the import cost.
+    New local exposure per tick is capped at the conversion limit so it can always be
+    converted on the next tick.
+    """
+
+    def __init__(self, product: str, conversion_limit: int = 10, position_limit: int = 75,
+                 min_edge: float = 0.5, passive_edge: float = None):
+        self.product = product
+        self.conversion_limit = conversion_limit
+        self.position_limit = position_limit
+        self.min_edge = min_edge
+        self.passive_edge = passive_edge
+
+    def conversions(self, observation: ConversionObservation, order_depth: OrderDepth, position: int) -> int:
+        """
+        Signed conversion request for the current position (0 when the local book is cheaper).
+        """
+        if position < 0:
+            best_ask = min(order_depth.sell_orders) if order_depth.sell_orders else math.inf
+            if import_cost(observation) < best_ask:
+                return min(-position, self.conversion_limit)
+        elif position > 0:
+            best_bid = max(order_depth.buy_orders) if order_depth.buy_orders else -math.inf
+            if export_proceeds(observation) > best_bid:
+                return -min(position, self.conversion_limit)
+        return 0
+
+    def plan(self, observation: ConversionObservation, order_depth: OrderDepth, position: int) -> Tuple[List[Order], int]:
+        """
+        Local orders and the conversion request for this tick.
+        """
+        conversions = self.conversions(observation, order_depth, position)
+        # Position once this tick's conversions settle.
+        settled = position + conversions
+        orders: List[Order] = []
+
+        # Sell locally above the import cost, to be covered by importing next tick.
+        sell_capacity = min(self.conversion_limit, self.position_limit + settled)
+        threshold = import_cost(observation) + self.min_edge
+        for price in sorted((p for p in order_depth.buy_orders if p > threshold), reverse=True):
+            if sell_capacity <= 0:
+                break
+            quantity = min(order_depth.buy_orders[price], sell_capacity)
+            orders.append(Order(self.product, price, -quantity))
+            sell_capacity -= quantity
+
+        # Buy locally below the export proceeds, to be exported next tick.
+        buy_capacity = min(self.conversion_limit, self.position_limit - settled)
+        threshold = export_proceeds(observation) - self.min_edge
+        for price in sorted(p for p in order_depth.sell_orders if p < threshold):
+            if buy_capacity <= 0:
+                break
+            quantity = min(-order_depth.sell_orders[price], buy_capacity)
+            orders.append(Order(self.product, price, quantity))
+            buy_capacity -= quantity
+
+        # Rest the remaining sell capacity just above the import cost.
+        if self.passive_edge is not None and sell_capacity > 0:
+            price = math.ceil(import_cost(observation) + self.passive_edge)
+            best_bid = max(order_depth.buy_orders) if order_depth.buy_orders else None
+            if best_bid is None or price > best_bid:
+                orders.append(Order(self.product, price, -sell_capacity))
+
+        return orders, conversions
@@ -0,0 +1,84 @@
+from collections import deque
+from typing import Dict, List, Tuple
+from datamodel import Trade
+
+# Names that are not bots: our own fills and trades with no counterparty attached.
+IGNORED_TRADERS = ("SUBMISSION", "", None)
+
+
+class CounterpartyIndex:
+    """
+    Running per-(trader, product) statistics over state.market_trades.
+
+    For every trader it keeps net signed volume, gross volume and the markout of their
+    trades: signed quantity times the mid move from the tick the trade arrived to `horizon`
+    ticks later. A positive markout per unit means the trader's buys tend to precede rises,
+    i.e. informed flow worth following; a negative one flags flow worth fading.
+
+    Memory is bounded by the number of (trader, product) pairs plus `horizon` ticks of
+    unresolved trades, and every query is a dict lookup.
+
+    No Trader uses it yet: backtester.counterparties runs the same statistics over whole
+    days, and nothing trades on a counterparty until that shows its markout is stable.
+    """
+
+    def __init__(self, horizon: int = 10):
+        self.horizon = horizon
+        self.tick = 0
+        self.net_volume: Dict[Tuple[str, str], int] = {}
+        self.gross_volume: Dict[Tuple[str, str], int] = {}
+        self.markout: Dict[Tuple[str, str], float] = {}
+        self.resolved_volume: Dict[Tuple[str, str], int] = {}
+        # (tick, product, mid at arrival, [(trader, signed quantity), ...]) awaiting their markout.
+        self.pending = deque()
+        self.mids: Dict[str, float] = {}
+        self.last_trade: Dict[str, int] = {}
+
+    def update(self, market_trades: Dict[str, List[Trade]], mids: Dict[str, float]):
+        """
+        Record this tick's market trades; `mids` holds this tick's mid per product (0 if one-sided).
+        """
+        for product, mid in mids.items():
+            if mid:
+                self.mids[product] = mid
+
+        while self.pending and self.pending[0][0] <= self.tick - self.horizon:
+            _, product, start, fills = self.pending.popleft()
+            move = self.mids[product] - start
+            for key, quantity in fills:
+                self.markout[key] = self.markout.get(key, 0.0) + quantity * move
+                self.resolved_volume[key] = self.resolved_volume.get(key, 0) + abs(quantity)
+
+        for product, trades in market_trades.items():
+            last = self.last_trade.get(product, -1)
+            fills = []
+            for trade in trades:
+                if trade.timestamp <= last:
+                    continue
+                for trader, quantity in ((trade.buyer, trade.quantity), (trade.seller, -trade.quantity)):
+                    if trader in IGNORED_TRADERS:
+                        continue
+                    key = (trader, product)
+                    self.net_volume[key] = self.net_volume.get(key, 0) + quantity
+                    self.gross_volume[key] = self.gross_volume.get(key, 0) + abs(quantity)
+                    fills.append((key, quantity))
+            if trades:
+                self.last_trade[product] = max(last, trades[-1].timestamp)
+            if fills and product in self.mids:
+                self.pending.append((self.tick, product, self.mids[product], fills))
+        self.tick += 1
+
+    def markout_per_unit(self, trader: str, product: str) -> float:
+        """
+        Average mid move in the direction of the trader's trades, per unit whose markout is known.
+        """
+        key = (trader, product)
+        resolved = self.resolved_volume.get(key, 0)
+        return self.markout.get(key, 0.0) / resolved if resolved else 0.0
+
+    def stats(self, trader: str, product: str) -> Tuple[int, int, float]:
+        """
+        (net volume, gross volume, markout per unit) for one trader and product.
+        """
+        key = (trader, product)
+        return self.net_volume.get(key, 0), self.gross_volume.get(key, 0), self.markout_per_unit(trader, product)
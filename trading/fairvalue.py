@@ -0,0 +1,30 @@
+from typing import Dict, Optional, Tuple
+from trading.snapshot import MarketSnapshot
+
+# The estimators read the per-side depth and notional columns MarketSnapshot already
+# accumulated for this tick, so no book is scanned a second time.
+
+
+def fair_values(snapshot: MarketSnapshot, pid: int) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """
+    (vwap, microprice, imbalance_mid) of one product, or Nones when either side of its book is empty.
+
+    vwap is the volume-weighted average price of every resting order on both sides; microprice
+    weights the best bid and ask by the opposite side's top volume; imbalance_mid shifts the mid
+    by half the spread times the full-depth imbalance (bid depth - ask depth) / (bid depth + ask depth).
+    """
+    if snapshot.best_bid[pid] is None or snapshot.best_ask[pid] is None:
+        return None, None, None
+    bid_depth = snapshot.bid_depth[pid]
+    ask_depth = snapshot.ask_depth[pid]
+    total_depth = bid_depth + ask_depth
+    mid = snapshot.mid[pid]
+    if total_depth <= 0:
+        return None, snapshot.microprice[pid], mid
+    vwap = (snapshot.bid_notional[pid] + snapshot.ask_notional[pid]) / total_depth
+    weighted_mid = mid + (bid_depth - ask_depth) / total_depth * snapshot.spread[pid] / 2.0
+    return vwap, snapshot.microprice[pid], weighted_mid
+
+
+# Position of each estimator in the tuple returned by fair_values.
+FAIR_VALUE_INDEX: Dict[str, int] = {"vwap": 0, "microprice": 1, "imbalance_mid": 2}
@@ -0,0 +1,61 @@
+from typing import Dict, List
+import numpy as np
+from datamodel import Order, OrderDepth
+
+
+class DeltaHedger:
+    """
+    Keeps the book's net delta inside a band by trading the underlying.
+
+    Net delta is the sum of voucher positions times their Black-Scholes deltas plus the
+    underlying position. Nothing is sent while it stays within +/- `band`; once breached,
+    the hedger trades back to zero delta, taking at most `max_levels` price levels of the
+    underlying's book so a thin book limits the hedge instead of paying through it.
+    """
+
+    def __init__(self, underlying: str, band: float = 15.0, max_levels: int = 2):
+        self.underlying = underlying
+        self.band = band
+        self.max_levels = max_levels
+        self.net_delta = 0.0
+        self.rebalances = 0
+
+    def portfolio_delta(self, products: List[str], deltas: np.ndarray, position: Dict[str, int]) -> float:
+        """
+        Voucher delta in units of the underlying, from current positions.
+        """
+        quantities = np.array([position.get(p, 0) for p in products], dtype=float)
+        return float(quantities @ deltas)
+
+    def hedge(self, products: List[str], deltas: np.ndarray, position: Dict[str, int],
+              order_depth: OrderDepth) -> List[Order]:
+        """
+        Orders on the underlying that bring net delta back to zero once it leaves the band.
+        """
+        underlying_position = position.get(self.underlying, 0)
+        self.net_delta = self.portfolio_delta(products, deltas, position) + underlying_position
+        if abs(self.net_delta) <= self.band or order_depth is None:
+            return []
+
+        # Positive net delta -> sell the underlying into the bids, negative -> buy the asks.
+        required = -int(round(self.net_delta))
+        orders: List[Order] = []
+        if required > 0:
+            levels = sorted(order_depth.sell_orders.items())[:self.max_levels]
+            for price, volume in levels:
+                quantity = min(required, -volume)
+                orders.append(Order(self.underlying, price, quantity))
+                required -= quantity
+                if required == 0:
+                    break
+        else:
+            levels = sorted(order_depth.buy_orders.items(), reverse=True)[:self.max_levels]
+            for price, volume in levels:
+                quantity = min(-required, volume)
+                orders.append(Order(self.underlying, price, -quantity))
+                required += quantity
+                if required == 0:
+                    break
+        if orders:
+            self.rebalances += 1
+        return orders
@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional
+from datamodel import Order, Trade
+from trading.snapshot import MarketSnapshot
+
+
+class ChangeDetector:
+    """
+    Lets per-product strategies reuse last tick's decision when nothing they read has changed.
+
+    The fingerprint is built from the snapshot's top-of-book levels, top volumes, depth
+    totals and notionals (which change with any level below the top), plus our position
+    and whether any own/market trades arrived since the last tick.
+    Only strategies whose output is a pure function of those inputs should use it.
+    """
+
+    def __init__(self):
+        self.fingerprints: Dict[str, tuple] = {}
+        self.decisions: Dict[str, List[Order]] = {}
+        # Per-product counters of product-ticks that were recomputed or reused.
+        self.processed: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+
+    @staticmethod
+    def fingerprint(snapshot: MarketSnapshot, pid: int, position: int,
+                    own_trades: Optional[List[Trade]], market_trades: Optional[List[Trade]]) -> tuple:
+        """
+        Cheap tuple identifying everything a book-driven strategy reads for one product.
+        """
+        return (
+            snapshot.best_bid[pid], snapshot.best_bid_volume[pid], snapshot.bid_depth[pid], snapshot.bid_notional[pid],
+            snapshot.best_ask[pid], snapshot.best_ask_volume[pid], snapshot.ask_depth[pid], snapshot.ask_notional[pid],
+            position,
+            (len(own_trades), own_trades[-1].timestamp) if own_trades else None,
+            (len(market_trades), market_trades[-1].timestamp) if market_trades else None,
+        )
+
+    def reuse(self, product: str, fingerprint: tuple) -> Optional[List[Order]]:
+        """
+        Last tick's orders if the fingerprint is unchanged, otherwise None.
+        """
+        if self.fingerprints.get(product) == fingerprint:
+            self.skipped[product] = self.skipped.get(product, 0) + 1
+            return self.decisions[product]
+        return None
+
+    def store(self, product: str, fingerprint: tuple, orders: List[Order]):
+        """
+        Remember a freshly computed decision and the inputs it was made from.
+        """
+        self.fingerprints[product] = fingerprint
+        self.decisions[product] = orders
+        self.processed[product] = self.processed.get(product, 0) + 1
+
+    def summary(self) -> str:
+        """
+        One-line "skipped/total" report per product.
+        """
+        products = sorted(set(self.processed) | set(self.skipped))
+        return ", ".join(
+            f"{p}: {self.skipped.get(p, 0)}/{self.skipped.get(p, 0) + self.processed.get(p, 0)}" for p in products
+        )
@@ -0,0 +1,122 @@
+import math
+from typing import List
+from datamodel import Order, OrderDepth
+
+
+class MarketMaker:
+    """
+    Take-then-quote market making around a fair value.
+
+    1. Takes every resting level that is mispriced against fair value (asks below it,
+       bids above it), plus levels at exactly fair when that reduces the position.
+    2. Posts the remaining capacity passively in `layers` levels, one tick inside the best
+       remaining quote on each side but never closer than half the spread to the
+       reservation price.
+    Quantities never take the position past `limit` in either direction.
+
+    Without `risk_aversion` the reservation price is fair value and the half spread is
+    `min_edge`. With it, quotes follow Avellaneda-Stoikov in closed form, with q the position:
+        reservation = fair - q * risk_aversion * volatility^2 * horizon
+        half_spread = risk_aversion * volatility^2 * horizon / 2 + ln(1 + risk_aversion / kappa) / risk_aversion
+    so a long book quotes lower (selling sooner, buying later) and a short one higher. Each
+    side's half spread is then scaled by 1 -/+ inventory_skew * q / limit, widening the side
+    that adds to the position and narrowing the one that reduces it, and the reducing side
+    moves from one tick inside the touch towards its own limit (never past fair) by a
+    fraction (|q| / limit)^2, so small positions keep pennying and a full book leans hard.
+    With risk_aversion 0.04, fair 10000, book 9995/10005 and limit 50, the asks are
+    10004/10005 flat, 10003/10004 at q=+25, 10002/10003 at q=+40 and 10000/10001 at q=+50.
+    """
+
+    def __init__(self, layers: int = 2, min_edge: int = 1, risk_aversion: float = None,
+                 volatility: float = 1.0, horizon: float = 1.0, kappa: float = 1.0, inventory_skew: float = 0.5):
+        self.layers = layers
+        self.min_edge = min_edge
+        self.risk_aversion = risk_aversion
+        self.volatility = volatility
+        self.horizon = horizon
+        self.kappa = kappa
+        self.inventory_skew = inventory_skew
+
+    def quote_center(self, fair: float, position: int, limit: int):
+        """
+        Reservation price and the bid and ask half spreads for the current position.
+        """
+        if not self.risk_aversion:
+            return fair, self.min_edge, self.min_edge
+        inventory_risk = self.risk_aversion * self.volatility ** 2 * self.horizon
+        reservation = fair - position * inventory_risk
+        half_spread = 0.5 * inventory_risk + math.log(1 + self.risk_aversion / self.kappa) / self.risk_aversion
+        tilt = self.inventory_skew * max(-1.0, min(1.0, position / limit)) if limit else 0.0
+        return reservation, half_spread * (1 + tilt), half_spread * (1 - tilt)
+
+    def orders(self, product: str, order_depth: OrderDepth, position: int, fair: float, limit: int) -> List[Order]:
+        orders: List[Order] = []
+        buy_capacity = limit - position
+        sell_capacity = limit + position
+
+        # 1) Take mispriced liquidity, best prices first.
+        best_ask = None
+        for price in sorted(order_depth.sell_orders):
+            volume = -order_depth.sell_orders[price]
+            if (price < fair or (price == fair and position < 0)) and buy_capacity > 0:
+                quantity = min(volume, buy_capacity)
+                orders.append(Order(product, price, quantity))
+                buy_capacity -= quantity
+                position += quantity
+                if quantity < volume:
+                    best_ask = price
+                    break
+            else:
+                best_ask = price
+                break
+        best_bid = None
+        for price in sorted(order_depth.buy_orders, reverse=True):
+            volume = order_depth.buy_orders[price]
+            if (price > fair or (price == fair and position > 0)) and sell_capacity > 0:
+                quantity = min(volume, sell_capacity)
+                orders.append(Order(product, price, -quantity))
+                sell_capacity -= quantity
+                position -= quantity
+                if quantity < volume:
+                    best_bid = price
+                    break
+            else:
+                best_bid = price
+                break
+
+        # 2) Quote what is left one tick inside the remaining book, around the reservation price.
+        reservation, bid_half, ask_half = self.quote_center(fair, position, limit)
+        bid_limit = math.floor(reservation - bid_half)
+        ask_limit = math.ceil(reservation + ask_half)
+        bid_price = bid_limit if best_bid is None else min(best_bid + 1, bid_limit)
+        ask_price = ask_limit if best_ask is None else max(best_ask - 1, ask_limit)
+        if self.risk_aversion and limit:
+            # In a wide book, lean the side that reduces inventory from the touch towards its
+            # limit, but never past fair value.
+            urgency = min(abs(position) / limit, 1.0) ** 2
+            if position > 0:
+                ask_price = max(math.ceil(ask_price - (ask_price - ask_limit) * urgency), math.ceil(fair))
+            elif position < 0:
+                bid_price = min(math.floor(bid_price + (bid_limit - bid_price) * urgency), math.floor(fair))
+        # A skewed quote must stay passive rather than cross the remaining book.
+        if best_ask is not None:
+            bid_price = min(bid_price, best_ask - 1)
+        if best_bid is not None:
+            ask_price = max(ask_price, best_bid + 1)
+        orders.extend(self._layers(product, bid_price, buy_capacity, -1))
+        orders.extend(self._layers(product, ask_price, sell_capacity, 1))
+        return orders
+
+    def _layers(self, product: str, price: int, capacity: int, direction: int) -> List[Order]:
+        """
+        Split capacity over `layers` prices stepping away from the touch; the first layer gets the remainder.
+        """
+        if capacity <= 0:
+            return []
+        size, remainder = divmod(capacity, self.layers)
+        orders = []
+        for k in range(self.layers):
+            quantity = size + (remainder if k == 0 else 0)
+            if quantity > 0:
+                orders.append(Order(product, price + direction * k, -direction * quantity))
+        return orders
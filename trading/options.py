@@ -0,0 +1,251 @@
+import math
+from typing import Dict, Optional, Tuple
+import numpy as np
+from trading.snapshot import MarketSnapshot
+
+# VOLCANIC_ROCK_VOUCHER_<strike> gives the right to buy VOLCANIC_ROCK at <strike> on expiry.
+VOUCHER_STRIKES: Dict[str, int] = {
+    "VOLCANIC_ROCK_VOUCHER_9500": 9500,
+    "VOLCANIC_ROCK_VOUCHER_9750": 9750,
+    "VOLCANIC_ROCK_VOUCHER_10000": 10000,
+    "VOLCANIC_ROCK_VOUCHER_10250": 10250,
+    "VOLCANIC_ROCK_VOUCHER_10500": 10500,
+}
+UNDERLYING = "VOLCANIC_ROCK"
+# One simulated day spans timestamps 0..999900.
+TICKS_PER_DAY = 1_000_000
+
+_SQRT2 = math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def erf(x: np.ndarray) -> np.ndarray:
+    """
+    Vectorised error function (Abramowitz & Stegun 7.1.26, absolute error < 1.5e-7).
+    """
+    x = np.asarray(x, dtype=float)
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + erf(x / _SQRT2))
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def black_scholes(spot: float, strikes: np.ndarray, tte: float, vols: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    European call price, delta, gamma and vega for every strike in one call (zero rates).
+    `tte` and `vols` must use the same time unit, e.g. days and volatility per sqrt(day).
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    vols = np.asarray(vols, dtype=float)
+    sqrt_t = math.sqrt(tte)
+    vol_sqrt_t = vols * sqrt_t
+    d1 = (np.log(spot / strikes) + 0.5 * vol_sqrt_t * vol_sqrt_t) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    cdf_d1 = norm_cdf(d1)
+    pdf_d1 = norm_pdf(d1)
+    price = spot * cdf_d1 - strikes * norm_cdf(d2)
+    delta = cdf_d1
+    gamma = pdf_d1 / (spot * vol_sqrt_t)
+    vega = spot * pdf_d1 * sqrt_t
+    return price, delta, gamma, vega
+
+
+def implied_vol(prices: np.ndarray, spot: float, strikes: np.ndarray, tte: float, guess: np.ndarray,
+                tol: float = 1e-7, max_iter: int = 8, low: float = 1e-4, high: float = 1.0,
+                default_guess: float = 0.0125) -> Tuple[np.ndarray, int]:
+    """
+    Implied volatility for every strike at once.
+
+    Runs vectorised Halley steps from `guess` (e.g. last tick's vols; `default_guess` where
+    that is missing or out of range) and falls back to
+    bisection on [low, high] only for strikes that did not converge. Prices outside the
+    no-arbitrage bounds (below intrinsic or above spot), or whose vol lies outside
+    [low, high], give NaN.
+    Returns the vols and the number of strikes that needed the bisection fallback.
+    """
+    prices = np.asarray(prices, dtype=float)
+    strikes = np.asarray(strikes, dtype=float)
+    intrinsic = np.maximum(spot - strikes, 0.0)
+    valid = np.isfinite(prices) & (prices > intrinsic) & (prices < spot)
+    guess = np.asarray(guess, dtype=float)
+    vols = np.where(np.isfinite(guess) & (guess > low) & (guess < high), guess, default_guess)
+    vols = np.where(valid, vols, np.nan)
+    sqrt_t = math.sqrt(tte)
+    log_moneyness = np.log(spot / strikes)
+
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        v = vols[active]
+        k = strikes[active]
+        vol_sqrt_t = v * sqrt_t
+        d1 = (log_moneyness[active] + 0.5 * vol_sqrt_t * vol_sqrt_t) / vol_sqrt_t
+        d2 = d1 - vol_sqrt_t
+        diff = spot * norm_cdf(d1) - k * norm_cdf(d2) - prices[active]
+        vega = spot * norm_pdf(d1) * sqrt_t
+        volga = vega * d1 * d2 / v
+        # Halley step; plain Newton where the Halley denominator degenerates.
+        denominator = 2.0 * vega * vega - diff * volga
+        step = np.where(np.abs(denominator) > 1e-12, 2.0 * diff * vega / np.where(denominator == 0, 1.0, denominator),
+                        diff / np.maximum(vega, 1e-12))
+        updated = v - step
+        # Steps that leave [low, high] mark the strike as diverged; bisection picks it up below.
+        in_range = np.isfinite(updated) & (updated > low) & (updated < high)
+        vols[active] = np.where(in_range, updated, np.nan)
+        active[np.flatnonzero(active)] = in_range & (np.abs(diff) > tol)
+
+    failed = valid & (active | ~np.isfinite(vols))
+    fallbacks = int(failed.sum())
+    if fallbacks:
+        vols[failed] = _bisect_vol(prices[failed], spot, strikes[failed], tte, low, high, tol)
+    return vols, fallbacks
+
+
+def _bisect_vol(prices: np.ndarray, spot: float, strikes: np.ndarray, tte: float, low: float, high: float, tol: float) -> np.ndarray:
+    sqrt_t = math.sqrt(tte)
+    log_moneyness = np.log(spot / strikes)
+
+    def value(vol: np.ndarray) -> np.ndarray:
+        vol_sqrt_t = vol * sqrt_t
+        d1 = (log_moneyness + 0.5 * vol_sqrt_t * vol_sqrt_t) / vol_sqrt_t
+        return spot * norm_cdf(d1) - strikes * norm_cdf(d1 - vol_sqrt_t)
+
+    lo = np.full(len(prices), low)
+    hi = np.full(len(prices), high)
+    # A price the [low, high] vols cannot reach has no root to bisect towards.
+    bracketed = (value(lo) <= prices) & (prices <= value(hi))
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        too_high = value(mid) > prices
+        hi = np.where(too_high, mid, hi)
+        lo = np.where(too_high, lo, mid)
+        if np.max(hi - lo) < tol:
+            break
+    return np.where(bracketed, 0.5 * (lo + hi), np.nan)
+
+
+def moneyness(spot: float, strikes: np.ndarray, tte: float) -> np.ndarray:
+    """
+    Standardised moneyness log(K / S) / sqrt(T) used as the smile coordinate.
+    """
+    return np.log(np.asarray(strikes, dtype=float) / spot) / math.sqrt(tte)
+
+
+def fit_smile(m: np.ndarray, vols: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Quadratic smile vol(m) = a*m^2 + b*m + c through the finite implied vols
+    (np.polyfit coefficient order). None with fewer than three usable strikes.
+    """
+    usable = np.isfinite(vols)
+    if usable.sum() < 3:
+        return None
+    return np.polyfit(m[usable], vols[usable], 2)
+
+
+class VoucherPricer:
+    """
+    Prices every VOLCANIC_ROCK voucher each tick from the underlying mid.
+
+    Each tick the voucher mids are inverted to implied vols (warm-started from the previous
+    tick), a quadratic smile is fitted in moneyness, and every strike is priced off the smile,
+    so a strike quoted off the smile trades against its smile value. Results are numpy arrays
+    aligned with `products`/`strikes`;
+    `fair_values()` returns them keyed by voucher symbol for the Trader's fair-price lookup.
+
+    `days_to_expiry` is the life left at the start of the current day. Timestamps restart at
+    0 each day, so a timestamp below the previous one counts the expiry down by a day; the
+    count is persisted with the IV cache so it survives across days.
+    """
+
+    def __init__(self, strikes: Dict[str, int] = None, days_to_expiry: float = 6.0, volatility: float = 0.0125):
+        strikes = VOUCHER_STRIKES if strikes is None else strikes
+        self.products = list(strikes)
+        self.strikes = np.array([strikes[p] for p in self.products], dtype=float)
+        # Days left at timestamp 0 of the current day.
+        self.days_to_expiry = days_to_expiry
+        # Volatility per sqrt(day), one entry per strike.
+        self.vols = np.full(len(self.products), volatility)
+        self.default_volatility = volatility
+        # Last solved implied vols, used as the next tick's starting point.
+        self.implied_vols = np.full(len(self.products), np.nan)
+        self.smile: Optional[np.ndarray] = None
+        self.fallbacks = 0
+        self.spot: Optional[float] = None
+        self.tte = days_to_expiry
+        self.last_timestamp: Optional[int] = None
+        n = len(self.products)
+        self.price = np.zeros(n)
+        self.delta = np.zeros(n)
+        self.gamma = np.zeros(n)
+        self.vega = np.zeros(n)
+
+    def time_to_expiry(self, timestamp: int) -> float:
+        """
+        Remaining life in days, floored so pricing stays finite on the expiry tick.
+        """
+        return max(self.days_to_expiry - timestamp / TICKS_PER_DAY, 1e-6)
+
+    def update(self, snapshot: MarketSnapshot, timestamp: int) -> bool:
+        """
+        Reprice all strikes; returns False (keeping the last results) without a two-sided rock book.
+        """
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            self.days_to_expiry -= 1
+        self.last_timestamp = timestamp
+        spot = snapshot.get_mid(UNDERLYING)
+        if spot <= 0:
+            return False
+        self.spot = spot
+        self.tte = self.time_to_expiry(timestamp)
+
+        market = np.array([snapshot.get_mid(p) or np.nan for p in self.products])
+        guess = np.where(np.isfinite(self.implied_vols), self.implied_vols, self.vols)
+        ivs, self.fallbacks = implied_vol(market, spot, self.strikes, self.tte, guess,
+                                          default_guess=self.default_volatility)
+        # Keep the last good vol for strikes that could not be solved this tick.
+        self.implied_vols = np.where(np.isfinite(ivs), ivs, self.implied_vols)
+
+        m = moneyness(spot, self.strikes, self.tte)
+        smile = fit_smile(m, ivs)
+        if smile is not None:
+            self.smile = smile
+            self.vols = np.maximum(np.polyval(smile, m), 1e-4)
+
+        self.price, self.delta, self.gamma, self.vega = black_scholes(spot, self.strikes, self.tte, self.vols)
+        return True
+
+    def dump_state(self) -> dict:
+        """
+        Compact traderData form of the warm-start cache (implied vol per strike, None if unknown)
+        and of the expiry countdown.
+        """
+        return {
+            "vols": [None if not np.isfinite(v) else round(float(v), 6) for v in self.implied_vols],
+            "days_to_expiry": self.days_to_expiry,
+            "timestamp": self.last_timestamp,
+        }
+
+    def load_state(self, state: dict):
+        if not isinstance(state, dict):
+            return
+        vols = state.get("vols")
+        if vols and len(vols) == len(self.products):
+            self.implied_vols = np.array([np.nan if v is None else v for v in vols], dtype=float)
+        if state.get("days_to_expiry") is not None:
+            self.days_to_expiry = state["days_to_expiry"]
+            self.last_timestamp = state.get("timestamp")
+
+    def fair_values(self) -> Dict[str, float]:
+        if self.spot is None:
+            return {}
+        return dict(zip(self.products, self.price.tolist()))
@@ -0,0 +1,64 @@
+from collections import deque
+
+# Regime codes reported by SunlightRegime.
+NORMAL = 0
+FALLING = 1  # still above the critical index but trending towards it
+LOW = 2
+
+
+class SunlightRegime:
+    """
+    Incremental classifier of ConversionObservation.sunlightIndex, O(1) per tick.
+
+    Keeps a rolling least-squares slope over the last `window` observations using running
+    sums. The regime is LOW once sunlight drops below `critical` (left again only above
+    critical + `hysteresis`), FALLING while above it but with slope below -`slope_threshold`,
+    and NORMAL otherwise.
+    """
+
+    def __init__(self, critical: float = 45.0, window: int = 20, slope_threshold: float = 0.01, hysteresis: float = 1.0):
+        self.critical = critical
+        self.window = window
+        self.slope_threshold = slope_threshold
+        self.hysteresis = hysteresis
+        self.values = deque()
+        self.sum_y = 0.0
+        self.sum_xy = 0.0  # x = position in the window, oldest at 0
+        self.slope = 0.0
+        self.regime = NORMAL
+
+    def update(self, sunlight: float) -> int:
+        values = self.values
+        if len(values) == self.window:
+            oldest = values.popleft()
+            # Dropping the oldest value shifts every remaining x down by one.
+            self.sum_xy -= self.sum_y - oldest
+            self.sum_y -= oldest
+        self.sum_xy += len(values) * sunlight
+        self.sum_y += sunlight
+        values.append(sunlight)
+
+        n = len(values)
+        if n > 1:
+            sum_x = n * (n - 1) / 2.0
+            sum_xx = (n - 1) * n * (2 * n - 1) / 6.0
+            self.slope = (n * self.sum_xy - sum_x * self.sum_y) / (n * sum_xx - sum_x * sum_x)
+
+        if sunlight < self.critical or (self.regime == LOW and sunlight < self.critical + self.hysteresis):
+            self.regime = LOW
+        elif self.slope < -self.slope_threshold:
+            self.regime = FALLING
+        else:
+            self.regime = NORMAL
+        return self.regime
+
+    def short_multiplier(self) -> float:
+        """
+        Scale for directional sell size. Prices tend to rise once sunlight is below the
+        critical level, so shorts are cut while LOW and halved while FALLING.
+        """
+        if self.regime == LOW:
+            return 0.0
+        if self.regime == FALLING:
+            return 0.5
+        return 1.0
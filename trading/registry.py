@@ -0,0 +1,134 @@
+import statistics
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from trading.fairvalue import FAIR_VALUE_INDEX
+
+# Indicator names a ProductSpec can request. "history" keeps a rolling deque of
+# depth-VWAP samples; the fair-value names cache that live estimator every tick.
+HISTORY = "history"
+INDICATORS = frozenset((HISTORY,) + tuple(FAIR_VALUE_INDEX))
+
+
+class FixedPrice:
+    """
+    Constant fair price (e.g. RAINFOREST_RESIN at 10000).
+    """
+
+    # Decisions depend only on the book and position, so unchanged inputs can reuse them.
+    book_only = True
+
+    def __init__(self, price: float):
+        self.price = price
+
+    def __call__(self, history, live: Optional[float]) -> float:
+        return self.price
+
+
+class MedianPrice:
+    """
+    Average of the medians of the last `windows` history samples, once at least
+    `min_history` samples exist; `fallback` before that.
+    """
+
+    book_only = False
+
+    def __init__(self, windows: Tuple[int, ...], min_history: int, fallback: float):
+        self.windows = windows
+        self.min_history = min_history
+        self.fallback = fallback
+
+    def __call__(self, history, live: Optional[float]) -> float:
+        if history is None or len(history) <= self.min_history:
+            return self.fallback
+        samples = list(history)
+        return sum(statistics.median(samples[-window:]) for window in self.windows) / len(self.windows)
+
+
+class LivePrice:
+    """
+    The product's live estimate (a book estimator from trading.fairvalue, or a model value such
+    as a voucher's smile price), or `fallback` while there is none; a None fallback means no quote.
+    """
+
+    book_only = False
+
+    def __init__(self, fallback: Optional[float] = None):
+        self.fallback = fallback
+
+    def __call__(self, history, live: Optional[float]) -> Optional[float]:
+        return self.fallback if live is None else live
+
+
+class ProductSpec:
+    """
+    Declarative description of how a product is traded: the strategy that owns it,
+    how its fair price is computed, and which indicators it needs each tick.
+    """
+
+    def __init__(self, strategy: str, pricer: Callable = None, indicators: Iterable[str] = (), history_length: int = 100):
+        unknown = set(indicators) - INDICATORS
+        if unknown:
+            raise ValueError(f"Unknown indicators {sorted(unknown)}")
+        self.strategy = strategy
+        self.pricer = pricer
+        self.indicators = frozenset(indicators)
+        self.history_length = history_length
+        # Resolved from the indicator set so the hot path only reads attributes.
+        self.keeps_history = HISTORY in self.indicators
+        live = [name for name in self.indicators if name in FAIR_VALUE_INDEX]
+        if len(live) > 1:
+            raise ValueError("A product can use at most one live fair-value estimator")
+        self.live_index = FAIR_VALUE_INDEX[live[0]] if live else None
+
+    @property
+    def reusable(self) -> bool:
+        """
+        Whether last tick's decision can be reused when the book, position and trades are unchanged.
+        Read from the pricer so it stays right when the pricer is swapped (see backtester.walkforward).
+        """
+        return getattr(self.pricer, "book_only", False)
+
+
+class StrategyRegistry:
+    """
+    Maps every product to its ProductSpec and strategy handler.
+
+    `bind` resolves the declarations once into `dispatch` (product -> (handler, spec)),
+    so per-tick dispatch is a single dict lookup. Strategies that trade several products
+    together (basket arbitrage, macarons) are portfolio handlers: they run once per tick
+    and their products get a None handler in the per-product loop.
+    """
+
+    def __init__(self, specs: Dict[str, ProductSpec], default: ProductSpec):
+        self.specs = dict(specs)
+        self.default = default
+        self.dispatch: Dict[str, Tuple[Optional[Callable], ProductSpec]] = {}
+        self.portfolio: List[Tuple[str, Callable]] = []
+        self._product_handlers: Dict[str, Callable] = {}
+
+    def bind(self, product_handlers: Dict[str, Callable], portfolio_handlers: Dict[str, Callable]):
+        """
+        Resolve every declared product into the dispatch table.
+        """
+        self._product_handlers = dict(product_handlers)
+        self.portfolio = []
+        for spec in list(self.specs.values()) + [self.default]:
+            name = spec.strategy
+            if name in portfolio_handlers:
+                if name not in (n for n, _ in self.portfolio):
+                    self.portfolio.append((name, portfolio_handlers[name]))
+            elif name not in product_handlers:
+                raise ValueError(f"No handler bound for strategy {name!r}")
+        self.dispatch = {product: self._entry(spec) for product, spec in self.specs.items()}
+
+    def _entry(self, spec: ProductSpec) -> Tuple[Optional[Callable], ProductSpec]:
+        return self._product_handlers.get(spec.strategy), spec
+
+    def resolve(self, product: str) -> Tuple[Optional[Callable], ProductSpec]:
+        """
+        Dispatch entry for a product; undeclared products get the default spec,
+        cached on first sight.
+        """
+        entry = self.dispatch.get(product)
+        if entry is None:
+            entry = self.dispatch[product] = self._entry(self.default)
+        return entry
@@ -0,0 +1,96 @@
+from typing import Dict, List, Tuple
+from datamodel import Order
+
+# Per-product position limits. The exchange rejects every order for a product
+# if the sum of its buy (or sell) quantities could take us past the limit.
+POSITION_LIMITS: Dict[str, int] = {
+    "RAINFOREST_RESIN": 50,
+    "KELP": 50,
+    "SQUID_INK": 50,
+    "CROISSANTS": 250,
+    "JAMS": 350,
+    "DJEMBES": 60,
+    "PICNIC_BASKET1": 60,
+    "PICNIC_BASKET2": 100,
+    "VOLCANIC_ROCK": 400,
+    "VOLCANIC_ROCK_VOUCHER_9500": 200,
+    "VOLCANIC_ROCK_VOUCHER_9750": 200,
+    "VOLCANIC_ROCK_VOUCHER_10000": 200,
+    "VOLCANIC_ROCK_VOUCHER_10250": 200,
+    "VOLCANIC_ROCK_VOUCHER_10500": 200,
+    "MAGNIFICENT_MACARONS": 75,
+}
+
+
+class RiskLayer:
+    """
+    Collects order intents from every strategy during a tick and turns them into
+    one order list per symbol that the exchange will accept.
+
+    Opposing orders at the same price are netted, same-price orders are merged,
+    and the aggregate buy/sell quantity is clipped to the position limit, most
+    aggressive prices first.
+    """
+
+    def __init__(self, limits: Dict[str, int] = None):
+        self.limits = dict(POSITION_LIMITS if limits is None else limits)
+        # (strategy, order) pairs submitted since the last flush.
+        self.intents: List[Tuple[str, Order]] = []
+        # Signed quantity each strategy asked for per (symbol, price) in the last flush,
+        # before netting; lets a backtester attribute fills back to strategies.
+        self.tags: Dict[Tuple[str, int], Dict[str, int]] = {}
+
+    def submit(self, strategy: str, orders: List[Order]):
+        """
+        Queue orders produced by a strategy for this tick.
+        """
+        for order in orders:
+            if order.quantity != 0:
+                self.intents.append((strategy, order))
+
+    def flush(self, position: Dict[str, int]) -> Dict[str, List[Order]]:
+        """
+        Net, merge and clip all queued intents against the current positions.
+        Returns the order dict expected by Trader.run and clears the queue.
+        """
+        # 1) Net and merge: one signed quantity per (symbol, price).
+        book: Dict[str, Dict[int, int]] = {}
+        tags: Dict[Tuple[str, int], Dict[str, int]] = {}
+        for strategy, order in self.intents:
+            levels = book.setdefault(order.symbol, {})
+            levels[order.price] = levels.get(order.price, 0) + order.quantity
+            level_tags = tags.setdefault((order.symbol, order.price), {})
+            level_tags[strategy] = level_tags.get(strategy, 0) + order.quantity
+        self.intents = []
+        self.tags = tags
+
+        result: Dict[str, List[Order]] = {}
+        for symbol, levels in book.items():
+            current = position.get(symbol, 0)
+            limit = self.limits.get(symbol)
+            if limit is None:
+                buy_capacity = sell_capacity = None
+            else:
+                buy_capacity = max(0, limit - current)
+                sell_capacity = max(0, limit + current)
+
+            orders: List[Order] = []
+            # 2) Clip buys from the highest price down, sells from the lowest price up.
+            for price in sorted((p for p, q in levels.items() if q > 0), reverse=True):
+                quantity = levels[price]
+                if buy_capacity is not None:
+                    quantity = min(quantity, buy_capacity)
+                    buy_capacity -= quantity
+                if quantity > 0:
+                    orders.append(Order(symbol, price, quantity))
+            for price in sorted(p for p, q in levels.items() if q < 0):
+                quantity = -levels[price]
+                if sell_capacity is not None:
+                    quantity = min(quantity, sell_capacity)
+                    sell_capacity -= quantity
+                if quantity > 0:
+                    orders.append(Order(symbol, price, -quantity))
+
+            if orders:
+                result[symbol] = orders
+        return result
@@ -0,0 +1,93 @@
+from typing import List, Sequence
+import numpy as np
+from datamodel import ConversionObservation
+
+# Regressors of the macaron fair-value model, in order; an intercept is prepended.
+MACARON_FEATURES = ("importTariff", "exportTariff", "transportFees", "sugarPrice", "sunlightIndex")
+# Typical level and spread of each regressor over the round 4 days, used to standardise them
+# so every direction of the fit is on the same scale.
+MACARON_CENTER = (-4.0, 9.5, 1.5, 200.0, 55.0)
+MACARON_SCALE = (1.5, 1.0, 0.5, 10.0, 10.0)
+
+
+def macaron_features(observation: ConversionObservation) -> np.ndarray:
+    return np.array([1.0] + [float(getattr(observation, name)) for name in MACARON_FEATURES])
+
+
+class RecursiveLeastSquares:
+    """
+    Online linear regression with exponential forgetting.
+
+    Each update costs O(k^2) for k coefficients. `forgetting` < 1 discounts old observations
+    (an effective memory of about 1 / (1 - forgetting) ticks) so the fit follows regime changes.
+
+    Inputs are standardised with `center`/`scale` before use, and `theta`/`P` live in those
+    units; `predict` and `update` take raw features. Forgetting inflates P in directions the
+    data never moves (a tariff that stays constant), so the trace of P is capped at its
+    initial value: the fit is never less certain than the prior it was seeded with.
+    """
+
+    def __init__(self, coefficients: Sequence[float], forgetting: float = 0.999, initial_variance: float = 10.0,
+                 center: Sequence[float] = None, scale: Sequence[float] = None):
+        k = len(coefficients)
+        self.center = np.zeros(k) if center is None else np.array(center, dtype=float)
+        self.scale = np.ones(k) if scale is None else np.array(scale, dtype=float)
+        # Raw coefficients to standardised ones: theta_raw . x == theta . (x - center) / scale.
+        coefficients = np.array(coefficients, dtype=float)
+        self.theta = coefficients * self.scale
+        self.theta[0] += coefficients @ self.center
+        self.P = np.eye(k) * initial_variance
+        self.max_trace = k * initial_variance
+        self.forgetting = forgetting
+        self.updates = 0
+
+    def standardise(self, x: np.ndarray) -> np.ndarray:
+        return (x - self.center) / self.scale
+
+    def predict(self, x: np.ndarray) -> float:
+        return float(self.theta @ self.standardise(x))
+
+    def update(self, x: np.ndarray, y: float) -> float:
+        """
+        Fold in one observation; returns the prior prediction error.
+        """
+        z = self.standardise(x)
+        Pz = self.P @ z
+        gain = Pz / (self.forgetting + z @ Pz)
+        error = y - self.theta @ z
+        self.theta += gain * error
+        self.P = (self.P - np.outer(gain, Pz)) / self.forgetting
+        # Re-symmetrise to stop rounding errors from accumulating.
+        self.P = 0.5 * (self.P + self.P.T)
+        trace = np.trace(self.P)
+        if trace > self.max_trace:
+            self.P *= self.max_trace / trace
+        self.updates += 1
+        return float(error)
+
+    def dump_state(self) -> dict:
+        """
+        Compact traderData form: coefficients plus the upper triangle of P.
+        """
+        upper = self.P[np.triu_indices(len(self.theta))]
+        return {"theta": [float(f"{v:.8g}") for v in self.theta], "P": [float(f"{v:.8g}") for v in upper]}
+
+    def load_state(self, state: dict):
+        if not state or len(state.get("theta", ())) != len(self.theta):
+            return
+        k = len(self.theta)
+        self.theta = np.array(state["theta"], dtype=float)
+        P = np.zeros((k, k))
+        P[np.triu_indices(k)] = state["P"]
+        self.P = P + np.triu(P, 1).T
+
+
+def macaron_model() -> RecursiveLeastSquares:
+    """
+    RLS model seeded with the offline fit 545.34 - 32.16*importTariff + 22.09*exportTariff.
+    An initial variance of 0.01 per standardised coefficient makes that prior worth about
+    100 observations, so a single tick cannot overwrite it.
+    """
+    prior: List[float] = [545.34, -32.16, 22.09] + [0.0] * (len(MACARON_FEATURES) - 2)
+    return RecursiveLeastSquares(prior, initial_variance=0.01,
+                                 center=(0.0,) + MACARON_CENTER, scale=(1.0,) + MACARON_SCALE)
@@ -0,0 +1,77 @@
+from collections import deque
+from typing import Dict, Iterable, List
+from datamodel import OrderDepth, Trade
+
+
+def book_imbalance(order_depth: OrderDepth, levels: int = 3) -> float:
+    """
+    (bid volume - ask volume) / (bid volume + ask volume) over the top `levels` of each side,
+    in [-1, 1]; 0 for an empty book.
+    """
+    bid_volume = sum(order_depth.buy_orders[p] for p in sorted(order_depth.buy_orders, reverse=True)[:levels])
+    ask_volume = -sum(order_depth.sell_orders[p] for p in sorted(order_depth.sell_orders)[:levels])
+    total = bid_volume + ask_volume
+    return (bid_volume - ask_volume) / total if total > 0 else 0.0
+
+
+class SignalTracker:
+    """
+    Incremental short-horizon signals per product, updated once per tick:
+
+    - imbalance: top-`levels` book imbalance
+    - flow: signed market-trade volume over the last `window` ticks; a trade counts as a buy
+      if it printed above the previous tick's mid and as a sell if below
+    - returns: mid / mid `horizon` ticks ago - 1
+
+    Mids are carried forward over one-sided books. backtester.signal_eval computes the same
+    series in vectorised form.
+    """
+
+    def __init__(self, products: Iterable[str], levels: int = 3, horizon: int = 5, window: int = 10):
+        self.products = list(products)
+        self.levels = levels
+        self.horizon = horizon
+        self.window = window
+        self.imbalance: Dict[str, float] = {p: 0.0 for p in self.products}
+        self.flow: Dict[str, int] = {p: 0 for p in self.products}
+        self.returns: Dict[str, float] = {p: 0.0 for p in self.products}
+        self.mids: Dict[str, deque] = {p: deque(maxlen=horizon + 1) for p in self.products}
+        self.tick_flows: Dict[str, deque] = {p: deque() for p in self.products}
+        # Newest trade timestamp already counted, so re-sent trades are not double counted.
+        self.last_trade: Dict[str, int] = {p: -1 for p in self.products}
+
+    def update(self, order_depths: Dict[str, OrderDepth], market_trades: Dict[str, List[Trade]]):
+        for product in self.products:
+            mids = self.mids[product]
+            previous_mid = mids[-1] if mids else None
+
+            tick_flow = 0
+            trades = market_trades.get(product)
+            if trades and previous_mid is not None:
+                last = self.last_trade[product]
+                for trade in trades:
+                    if trade.timestamp > last:
+                        if trade.price > previous_mid:
+                            tick_flow += trade.quantity
+                        elif trade.price < previous_mid:
+                            tick_flow -= trade.quantity
+                self.last_trade[product] = max(last, trades[-1].timestamp)
+            tick_flows = self.tick_flows[product]
+            if len(tick_flows) == self.window:
+                self.flow[product] -= tick_flows.popleft()
+            tick_flows.append(tick_flow)
+            self.flow[product] += tick_flow
+
+            order_depth = order_depths.get(product)
+            if order_depth is None:
+                self.imbalance[product] = 0.0
+                mid = previous_mid
+            else:
+                self.imbalance[product] = book_imbalance(order_depth, self.levels)
+                if order_depth.buy_orders and order_depth.sell_orders:
+                    mid = (max(order_depth.buy_orders) + min(order_depth.sell_orders)) / 2.0
+                else:
+                    mid = previous_mid
+            if mid is not None:
+                mids.append(mid)
+            self.returns[product] = mids[-1] / mids[0] - 1 if len(mids) == self.horizon + 1 else 0.0
@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional
+from datamodel import OrderDepth
+
+
+class MarketSnapshot:
+    """
+    Top-of-book view of every product, built once per tick and shared by all strategies.
+
+    Values live in flat lists indexed by product id (see `index`), so strategies read
+    e.g. `snapshot.mid[snapshot.index["KELP"]]` instead of rescanning the order book.
+    Product ids are assigned the first time a product is seen and stay stable across ticks.
+    Missing levels are None; mid, spread and microprice are 0 unless both sides are present,
+    matching the old `find_midprice` fallback.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.products: List[str] = []
+        self.timestamp = 0
+        self.best_bid: List[Optional[int]] = []
+        self.best_ask: List[Optional[int]] = []
+        self.best_bid_volume: List[int] = []
+        self.best_ask_volume: List[int] = []  # positive, unlike OrderDepth.sell_orders
+        self.bid_depth: List[int] = []
+        self.ask_depth: List[int] = []  # positive
+        # Sum of price * volume over each side; also catches changes below the top level.
+        self.bid_notional: List[int] = []
+        self.ask_notional: List[int] = []  # positive
+        self.mid: List[float] = []
+        self.spread: List[float] = []
+        self.microprice: List[float] = []
+
+    def _add_product(self, product: str) -> int:
+        pid = len(self.products)
+        self.index[product] = pid
+        self.products.append(product)
+        for column in (self.best_bid, self.best_ask):
+            column.append(None)
+        for column in (self.best_bid_volume, self.best_ask_volume, self.bid_depth, self.ask_depth,
+                       self.bid_notional, self.ask_notional):
+            column.append(0)
+        for column in (self.mid, self.spread, self.microprice):
+            column.append(0.0)
+        return pid
+
+    def update(self, order_depths: Dict[str, OrderDepth], timestamp: int = 0):
+        """
+        Refresh every column from this tick's order depths with one pass over each side of each book.
+        Products absent this tick keep their id but have their levels cleared.
+        """
+        self.timestamp = timestamp
+        seen = set()
+        for product, order_depth in order_depths.items():
+            pid = self.index.get(product)
+            if pid is None:
+                pid = self._add_product(product)
+            seen.add(pid)
+
+            best_bid = None
+            bid_volume = 0
+            bid_depth = 0
+            bid_notional = 0
+            for price, volume in order_depth.buy_orders.items():
+                bid_depth += volume
+                bid_notional += price * volume
+                if best_bid is None or price > best_bid:
+                    best_bid = price
+                    bid_volume = volume
+
+            best_ask = None
+            ask_volume = 0
+            ask_depth = 0
+            ask_notional = 0
+            for price, volume in order_depth.sell_orders.items():
+                ask_depth -= volume
+                ask_notional -= price * volume
+                if best_ask is None or price < best_ask:
+                    best_ask = price
+                    ask_volume = -volume
+
+            self.best_bid[pid] = best_bid
+            self.best_ask[pid] = best_ask
+            self.best_bid_volume[pid] = bid_volume
+            self.best_ask_volume[pid] = ask_volume
+            self.bid_depth[pid] = bid_depth
+            self.ask_depth[pid] = ask_depth
+            self.bid_notional[pid] = bid_notional
+            self.ask_notional[pid] = ask_notional
+            if best_bid is not None and best_ask is not None:
+                self.mid[pid] = (best_bid + best_ask) / 2.0
+                self.spread[pid] = best_ask - best_bid
+                top_volume = bid_volume + ask_volume
+                if top_volume > 0:
+                    self.microprice[pid] = (best_bid * ask_volume + best_ask * bid_volume) / top_volume
+                else:
+                    self.microprice[pid] = self.mid[pid]
+            else:
+                self.mid[pid] = 0.0
+                self.spread[pid] = 0.0
+                self.microprice[pid] = 0.0
+
+        for pid in range(len(self.products)):
+            if pid not in seen:
+                self.best_bid[pid] = None
+                self.best_ask[pid] = None
+                self.best_bid_volume[pid] = self.best_ask_volume[pid] = 0
+                self.bid_depth[pid] = self.ask_depth[pid] = 0
+                self.bid_notional[pid] = self.ask_notional[pid] = 0
+                self.mid[pid] = self.spread[pid] = self.microprice[pid] = 0.0
+
+    def get_mid(self, product: str) -> float:
+        """
+        Mid price of a product, or 0 if it has no two-sided book this tick.
+        """
+        pid = self.index.get(product)
+        return 0 if pid is None else self.mid[pid]